@@ -7,8 +7,10 @@ Launches the AI co-pilot dialog for natural language Revit automation
 import sys
 import os
 
-# Add lib to path for imports
-lib_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'lib')
+# pyRevit normally puts the extension's lib folder on sys.path already;
+# add it only if missing (an import probe would hide ImportErrors raised
+# inside the lib modules, e.g. a missing anthropic or yaml package)
+lib_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'lib'))
 if lib_path not in sys.path:
     sys.path.insert(0, lib_path)
 
@@ -44,9 +46,9 @@ def main():
     """
     # Log button click
     logger.info("RevitAI Co-pilot button clicked")
-    logger.info(f"Revit Version: {__revit__.Application.VersionNumber}")  # noqa: F821
-    logger.info(f"pyRevit Version: {script.get_pyrevit_version()}")
-    logger.info(f"Document: {doc.Title if doc else 'None'}")
+    logger.info("Revit Version: %s", __revit__.Application.VersionNumber)  # noqa: F821
+    logger.info("pyRevit Version: %s", script.get_pyrevit_version())
+    logger.info("Document: %s", doc.Title if doc else 'None')
 
     # Console output
     print("=" * 60)
@@ -62,7 +64,7 @@ def main():
         show_copilot_dialog(uidoc)
 
     except Exception as e:
-        logger.error(f"Error in main entry point: {e}", exc_info=True)
+        logger.error("Error in main entry point: %s", e, exc_info=True)
         print(f"Error: {e}")
         # Show error in Revit
         from Autodesk.Revit.UI import TaskDialog
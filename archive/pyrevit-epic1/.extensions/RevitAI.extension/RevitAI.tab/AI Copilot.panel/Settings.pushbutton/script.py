@@ -7,8 +7,10 @@ Configure Claude API key and other settings
 import sys
 import os
 
-# Add lib to path for imports
-lib_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'lib')
+# pyRevit normally puts the extension's lib folder on sys.path already;
+# add it only if missing (an import probe would hide ImportErrors raised
+# inside the lib modules, e.g. a missing anthropic or yaml package)
+lib_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'lib'))
 if lib_path not in sys.path:
     sys.path.insert(0, lib_path)
 
@@ -80,47 +82,53 @@ Visit: https://console.anthropic.com/"""
         test_api_connection()
 
 
+def _open_folder(path: str):
+    """Open a folder in Windows Explorer"""
+    try:
+        # ShellExecute in-process; returns immediately without a child process
+        os.startfile(path)
+    except OSError:
+        import subprocess
+        # Use list args for security
+        subprocess.Popen(['explorer', path])
+
+
 def view_config_file(config_path: str):
     """Open configuration file location"""
-    import subprocess
-
     # Get directory and validate it exists
     config_dir = os.path.dirname(os.path.abspath(config_path))
 
     # Validate path is within expected directories (security check)
     if not os.path.exists(config_dir):
-        logger.warning(f"Config directory does not exist: {config_dir}")
+        logger.warning("Config directory does not exist: %s", config_dir)
         TaskDialog.Show("Error", "Configuration directory not found")
         return
 
     try:
-        # Open in Windows Explorer - use list args for security
-        subprocess.Popen(['explorer', config_dir])
-        logger.info(f"Opened config directory: {config_dir}")
+        _open_folder(config_dir)
+        logger.info("Opened config directory: %s", config_dir)
     except Exception as e:
-        logger.exception(f"Failed to open config directory: {e}")
+        logger.exception("Failed to open config directory: %s", e)
         TaskDialog.Show("Error", f"Failed to open folder:\n{e}")
 
 
 def view_logs():
     """Open logs directory"""
-    import subprocess
     from logger import get_log_directory
 
     log_dir = os.path.abspath(get_log_directory())
 
     # Validate log directory exists (security check)
     if not os.path.exists(log_dir):
-        logger.warning(f"Log directory does not exist: {log_dir}")
+        logger.warning("Log directory does not exist: %s", log_dir)
         TaskDialog.Show("Error", "Log directory not found")
         return
 
     try:
-        # Open in Windows Explorer - use list args for security
-        subprocess.Popen(['explorer', log_dir])
-        logger.info(f"Opened log directory: {log_dir}")
+        _open_folder(log_dir)
+        logger.info("Opened log directory: %s", log_dir)
     except Exception as e:
-        logger.exception(f"Failed to open log directory: {e}")
+        logger.exception("Failed to open log directory: %s", e)
         TaskDialog.Show("Error", f"Failed to open folder:\n{e}")
 
 
@@ -154,13 +162,13 @@ def test_api_connection():
 
     except ConfigurationError as e:
         TaskDialog.Show("Configuration Error", str(e))
-        logger.exception(f"API connection test error: {e}")
+        logger.exception("API connection test error: %s", e)
     except APIError as e:
         TaskDialog.Show("API Error", str(e))
-        logger.exception(f"API connection test error: {e}")
+        logger.exception("API connection test error: %s", e)
     except Exception as e:
         TaskDialog.Show("Error", f"Unexpected error:\n{e}")
-        logger.exception(f"API connection test error: {e}")
+        logger.exception("API connection test error: %s", e)
 
 
 def main():
@@ -173,7 +181,7 @@ def main():
     try:
         show_settings_dialog()
     except Exception as e:
-        logger.error(f"Error in settings: {e}", exc_info=True)
+        logger.error("Error in settings: %s", e, exc_info=True)
         TaskDialog.Show("Error", f"Settings error:\n{e}")
 
 
@@ -3,19 +3,202 @@ Claude API Client
 Handles communication with Claude API for natural language understanding
 """
 
+import re
 import json
-from typing import Dict, Any, Optional, List
+import time
+import random
+import importlib.util
+from functools import partial
+from typing import Dict, Any, Optional, List, Iterator, Callable, Tuple
+
+# Check for the anthropic SDK without importing it; the import itself is
+# deferred to first client construction (see _import_anthropic)
+ANTHROPIC_AVAILABLE = importlib.util.find_spec('anthropic') is not None
+if not ANTHROPIC_AVAILABLE:
+    print("Warning: anthropic SDK not available. Please install: pip install anthropic")
+
+# Bound by _import_anthropic()
+Anthropic = None
+AnthropicError = None
 
-# Try to import anthropic SDK
+# Use orjson (faster, native UTF-8) for JSON when installed
 try:
-    from anthropic import Anthropic, AnthropicError
-    ANTHROPIC_AVAILABLE = True
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj: Any, indent: bool = False) -> str:
+        """Serialize obj to a JSON string (non-ASCII characters kept as-is)"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode('utf-8')
 except ImportError:
-    ANTHROPIC_AVAILABLE = False
-    print("Warning: anthropic SDK not available. Please install: pip install anthropic")
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any, indent: bool = False) -> str:
+        """Serialize obj to a JSON string (non-ASCII characters kept as-is)"""
+        return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False)
 
 from exceptions import APIError, ConfigurationError
-from config_manager import get_config_manager
+from config_manager import get_config_manager, get_session_object, set_session_object
+
+
+# System prompt that defines Claude's behavior (static, built once at import)
+_SYSTEM_PROMPT = """You are an AI assistant for Revit, helping architects automate tasks through natural language.
+
+Your job is to parse the user's command and return a structured JSON action that describes what they want to do.
+
+**Supported Operations:**
+- create_dimensions: Add dimension chains to rooms or elements
+- create_tags: Add tags to doors, windows, rooms, or other elements
+- read_elements: Query element properties
+
+**Action Schema:**
+```json
+{
+  "operation": "create_dimensions | create_tags | read_elements",
+  "targets": {
+    "element_type": "Room | Wall | Door | Window | ...",
+    "scope": "Level 1 | current_view | selected | all",
+    "filter": {}  // Optional additional filters
+  },
+  "parameters": {
+    // Operation-specific parameters
+  },
+  "clarifications": []  // Questions if prompt is ambiguous
+}
+```
+
+**Important Rules:**
+1. Always return valid JSON (no markdown code blocks, no extra text)
+2. If the prompt is ambiguous, add clarifying questions to "clarifications" array
+3. Support both Hebrew and English commands
+4. Map level names accurately (e.g., "קומה 1" or "Level 1")
+5. Default to "current_view" scope if not specified
+6. Use firm standards from context when available
+
+**Examples:**
+
+Hebrew: "תוסיף מידות פנימיות לכל החדרים בקומה 1"
+→ {"operation": "create_dimensions", "targets": {"element_type": "Room", "scope": "Level 1"}, "parameters": {"offset_mm": 200, "style": "continuous"}, "clarifications": []}
+
+English: "Tag all doors on this floor"
+→ {"operation": "create_tags", "targets": {"element_type": "Door", "scope": "current_view"}, "parameters": {}, "clarifications": []}
+
+Ambiguous: "Add dimensions"
+→ {"operation": "create_dimensions", "targets": {}, "parameters": {}, "clarifications": ["Which elements do you want to dimension?", "Which level or view?"]}
+"""
+
+# System prompt as a prompt-cache breakpoint, so repeat requests within the
+# cache lifetime reuse the processed prompt instead of re-reading it
+_SYSTEM_BLOCKS = [
+    {"type": "text", "text": _SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}
+]
+
+# Fixed framing of the <context> block sent with every prompt
+_CONTEXT_HEADER = "<context>\nRevit Project Context:"
+_CONTEXT_FOOTER = "</context>"
+
+# User message wrapped around the context block and the user's prompt
+_USER_TEMPLATE = (
+    "{context}\n\n"
+    "<prompt>\n{prompt}\n</prompt>\n\n"
+    "Return JSON action schema as specified in the system prompt."
+)
+
+# Client settings read from config: (attribute, config key, default)
+_CLIENT_SETTINGS = (
+    ('model', 'api_settings.model', 'claude-sonnet-4-20250514'),
+    ('timeout', 'api_settings.timeout_seconds', 10),
+    ('max_retries', 'api_settings.max_retries', 3),
+    ('temperature', 'api_settings.temperature', 0.0),
+)
+
+# Action JSON is typically under 200 tokens; the cap bounds latency when the
+# model over-generates, and runs of blank lines end generation early
+_MAX_TOKENS = 512
+_STOP_SEQUENCES = ["\n\n\n"]
+_TRUNCATION_WARN_TOKENS = 500
+
+# HTTP statuses worth retrying (rate limit, server errors, overloaded)
+_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504, 529})
+
+# Backoff doubles from the base delay up to the per-wait cap; retries stop
+# once the total time spent would exceed the elapsed cap (seconds)
+_RETRY_BASE_DELAY = 0.5
+_MAX_RETRY_DELAY = 8.0
+_MAX_RETRY_ELAPSED = 30.0
+
+# Statuses for which the server's retry-after header is honored
+_RETRY_AFTER_STATUS = frozenset({429, 529})
+
+# Markdown code fence Claude sometimes wraps the JSON action in
+_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*\n?(.*?)\n?```\s*$', re.DOTALL)
+
+# Session variable holding the Anthropic client cache so the SDK's HTTP
+# connection pool survives across pyRevit script runs
+_SESSION_ANTHROPIC_CLIENTS = '_revitai_claude_clients'
+
+# Anthropic clients keyed by (API key, read timeout) (see _get_client_cache)
+_client_cache = None
+
+
+def _import_anthropic() -> None:
+    """Import the anthropic SDK names on first use"""
+    global Anthropic, AnthropicError
+    if Anthropic is None:
+        from anthropic import Anthropic
+    if AnthropicError is None:
+        from anthropic import AnthropicError
+
+
+def _get_client_cache() -> Dict[Tuple[str, float], Any]:
+    """Get the Anthropic client cache shared by all ClaudeClient instances"""
+    global _client_cache
+    if _client_cache is None:
+        _client_cache = get_session_object(_SESSION_ANTHROPIC_CLIENTS)
+        if _client_cache is None:
+            _client_cache = {}
+            set_session_object(_SESSION_ANTHROPIC_CLIENTS, _client_cache)
+    return _client_cache
+
+
+def _retry_after_seconds(error) -> Optional[float]:
+    """Server-requested wait from a 429/529 response, or None if absent"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    try:
+        millis = headers.get('retry-after-ms')
+        if millis is not None:
+            return max(float(millis) / 1000.0, 0.0)
+        seconds = headers.get('retry-after')
+        if seconds is not None:
+            return max(float(seconds), 0.0)
+    except (TypeError, ValueError):
+        # HTTP-date form or garbage: fall back to the computed backoff
+        pass
+    return None
+
+
+def _create_anthropic_client(api_key: str, timeout: float):
+    """
+    Create an Anthropic client with explicit timeouts and a small connection pool
+
+    The SDK's own retries are disabled; ClaudeClient._call_with_retry
+    handles them so attempts are not double-counted.
+
+    Args:
+        api_key: Claude API key
+        timeout: Read timeout in seconds
+    """
+    import httpx
+    from anthropic import DefaultHttpxClient
+
+    return Anthropic(
+        api_key=api_key,
+        timeout=httpx.Timeout(timeout, connect=5.0, write=5.0, pool=5.0),
+        max_retries=0,
+        http_client=DefaultHttpxClient(
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=2)
+        )
+    )
 
 
 class ClaudeClient:
@@ -29,6 +212,8 @@ class ClaudeClient:
     - Error handling and retries
     """
 
+    __slots__ = ('client', 'config', 'model', 'timeout', 'max_retries', 'temperature', '_stream')
+
     def __init__(self, api_key: Optional[str] = None):
         """
         Initialize Claude API client
@@ -46,6 +231,11 @@ class ClaudeClient:
                 "Please run: pip install anthropic"
             )
 
+        try:
+            _import_anthropic()
+        except ImportError as e:
+            raise APIError(f"Failed to import Anthropic SDK: {e}") from e
+
         # Get API key from parameter or config
         if api_key is None:
             config = get_config_manager()
@@ -57,23 +247,41 @@ class ClaudeClient:
                 "Please set API key using Settings dialog or CLAUDE_API_KEY environment variable."
             )
 
-        # Initialize Anthropic client
-        try:
-            self.client = Anthropic(api_key=api_key)
-        except Exception as e:
-            raise APIError(f"Failed to initialize Anthropic client: {e}") from e
-
         # Load config
         self.config = get_config_manager()
-        self.model = self.config.get('api_settings.model', 'claude-sonnet-4-20250514')
-        self.timeout = self.config.get('api_settings.timeout_seconds', 10)
-        self.max_retries = self.config.get('api_settings.max_retries', 3)
-        self.temperature = self.config.get('api_settings.temperature', 0.0)
+        get = self.config.get
+        for attr, key, default in _CLIENT_SETTINGS:
+            setattr(self, attr, get(key, default))
+
+        # Initialize Anthropic client, reusing one already built for this
+        # key and timeout (the client carries the timeouts, see
+        # _create_anthropic_client)
+        clients = _get_client_cache()
+        client_key = (api_key, self.timeout)
+        self.client = clients.get(client_key)
+        if self.client is None:
+            try:
+                self.client = _create_anthropic_client(api_key, self.timeout)
+            except Exception as e:
+                raise APIError(f"Failed to initialize Anthropic client: {e}") from e
+            clients[client_key] = self.client
+
+        # Pre-bind the per-client request arguments so each call only
+        # supplies the messages
+        self._stream = partial(
+            self.client.messages.stream,
+            model=self.model,
+            max_tokens=_MAX_TOKENS,
+            stop_sequences=_STOP_SEQUENCES,
+            temperature=self.temperature,
+            system=_SYSTEM_BLOCKS
+        )
 
     def parse_prompt(
         self,
         user_prompt: str,
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        progress_cb: Optional[Callable[[str], None]] = None
     ) -> Dict[str, Any]:
         """
         Parse user's natural language prompt into structured action
@@ -81,6 +289,7 @@ class ClaudeClient:
         Args:
             user_prompt: User's natural language command (Hebrew or English)
             context: Revit project context (levels, elements, view, etc.)
+            progress_cb: Called with each text chunk as the response streams in
 
         Returns:
             Dictionary with structured action:
@@ -98,121 +307,158 @@ class ClaudeClient:
         context_str = self._build_context_string(context or {})
 
         # Build full prompt
-        system_prompt = self._get_system_prompt()
-        full_prompt = f"""{context_str}
-
-<prompt>
-{user_prompt}
-</prompt>
-
-Return JSON action schema as specified in the system prompt."""
+        full_prompt = _USER_TEMPLATE.format(context=context_str, prompt=user_prompt)
 
         try:
-            # Call Claude API
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=1024,
-                temperature=self.temperature,
-                system=system_prompt,
-                messages=[
-                    {"role": "user", "content": full_prompt}
-                ]
+            # Call Claude API, streaming the response text
+            response_text = self._call_with_retry(
+                self._stream_text,
+                [{"role": "user", "content": full_prompt}],
+                progress_cb
             )
 
-            # Extract response text
-            response_text = response.content[0].text
-
             # Parse JSON response
             action = self._parse_json_response(response_text)
 
             return action
 
+        except APIError:
+            raise
         except AnthropicError as e:
             raise APIError(f"Claude API error: {e}") from e
         except Exception as e:
             raise APIError(f"Unexpected error calling Claude API: {e}") from e
 
-    def _get_system_prompt(self) -> str:
-        """Get system prompt that defines Claude's behavior"""
-        return """You are an AI assistant for Revit, helping architects automate tasks through natural language.
+    def _stream_text(
+        self,
+        messages: List[Dict[str, str]],
+        progress_cb: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """
+        Stream a response and return its full text
 
-Your job is to parse the user's command and return a structured JSON action that describes what they want to do.
+        Args:
+            messages: Conversation messages to send
+            progress_cb: Called with each text chunk as it arrives
 
-**Supported Operations:**
-- create_dimensions: Add dimension chains to rooms or elements
-- create_tags: Add tags to doors, windows, rooms, or other elements
-- read_elements: Query element properties
+        Returns:
+            Concatenated response text
 
-**Action Schema:**
-```json
-{
-  "operation": "create_dimensions | create_tags | read_elements",
-  "targets": {
-    "element_type": "Room | Wall | Door | Window | ...",
-    "scope": "Level 1 | current_view | selected | all",
-    "filter": {}  // Optional additional filters
-  },
-  "parameters": {
-    // Operation-specific parameters
-  },
-  "clarifications": []  // Questions if prompt is ambiguous
-}
-```
+        Raises:
+            APIError: If the stream fails after progress_cb has received text
+                      (not retried, since a new attempt would replay the
+                      chunks the caller has already shown)
+        """
+        chunks = []
+        try:
+            with self._stream(messages=messages) as stream:
+                for text in stream.text_stream:
+                    chunks.append(text)
+                    if progress_cb is not None:
+                        progress_cb(text)
+                usage = stream.get_final_message().usage
+        except AnthropicError as e:
+            if chunks and progress_cb is not None:
+                raise APIError(f"Claude API error after partial response: {e}") from e
+            raise
+
+        if usage.output_tokens >= _TRUNCATION_WARN_TOKENS:
+            from logger import get_logger
+            get_logger(__name__).warning(
+                "Claude response used %d of %d max tokens and may be truncated",
+                usage.output_tokens, _MAX_TOKENS
+            )
+        return "".join(chunks)
 
-**Important Rules:**
-1. Always return valid JSON (no markdown code blocks, no extra text)
-2. If the prompt is ambiguous, add clarifying questions to "clarifications" array
-3. Support both Hebrew and English commands
-4. Map level names accurately (e.g., "קומה 1" or "Level 1")
-5. Default to "current_view" scope if not specified
-6. Use firm standards from context when available
+    def _call_with_retry(self, func: Callable, *args, **kwargs):
+        """
+        Call func, retrying transient API failures with jittered backoff
 
-**Examples:**
+        Rate limits, server errors, connection errors and timeouts are retried
+        up to max_retries times. Waits double from _RETRY_BASE_DELAY (jittered,
+        capped at _MAX_RETRY_DELAY); on 429/529 the server's retry-after is
+        used instead. A retry is skipped if it would push the total time past
+        _MAX_RETRY_ELAPSED. Other errors (auth, bad request) are raised at once.
 
-Hebrew: "תוסיף מידות פנימיות לכל החדרים בקומה 1"
-→ {"operation": "create_dimensions", "targets": {"element_type": "Room", "scope": "Level 1"}, "parameters": {"offset_mm": 200, "style": "continuous"}, "clarifications": []}
+        Args:
+            func: Function making the API request
+            *args, **kwargs: Arguments for func
 
-English: "Tag all doors on this floor"
-→ {"operation": "create_tags", "targets": {"element_type": "Door", "scope": "current_view"}, "parameters": {}, "clarifications": []}
+        Returns:
+            Result of func
+        """
+        from anthropic import APIConnectionError, APIStatusError
+
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                return func(*args, **kwargs)
+            except APIStatusError as e:
+                if e.status_code not in _RETRYABLE_STATUS or attempt >= self.max_retries:
+                    raise
+                if e.status_code in _RETRY_AFTER_STATUS:
+                    retry_after = _retry_after_seconds(e)
+                error = e
+            except APIConnectionError as e:
+                # Also covers APITimeoutError
+                if attempt >= self.max_retries:
+                    raise
+                error = e
+
+            delay = self._retry_delay(attempt, retry_after)
+            if time.monotonic() - start + delay > _MAX_RETRY_ELAPSED:
+                raise error
+            attempt += 1
+            time.sleep(delay)
+
+    @staticmethod
+    def _retry_delay(attempt: int, retry_after: Optional[float]) -> float:
+        """Seconds to wait before retry number attempt + 1"""
+        if retry_after is not None:
+            return retry_after
+        backoff = _RETRY_BASE_DELAY * (2 ** attempt) * random.uniform(0.5, 1.0)
+        return min(backoff, _MAX_RETRY_DELAY)
 
-Ambiguous: "Add dimensions"
-→ {"operation": "create_dimensions", "targets": {}, "parameters": {}, "clarifications": ["Which elements do you want to dimension?", "Which level or view?"]}
-"""
+    def _get_system_prompt(self) -> str:
+        """Get system prompt that defines Claude's behavior"""
+        return _SYSTEM_PROMPT
 
     def _build_context_string(self, context: Dict[str, Any]) -> str:
         """Build context string from Revit project context"""
-        context_parts = ["<context>", "Revit Project Context:"]
+        return "\n".join(self._iter_context_lines(context))
+
+    def _iter_context_lines(self, context: Dict[str, Any]) -> Iterator[str]:
+        """Yield the context block lines, skipping keys absent from context"""
+        yield _CONTEXT_HEADER
 
         # Current view
         if 'current_view' in context:
-            context_parts.append(f"- Current View: {context['current_view']}")
+            yield f"- Current View: {context['current_view']}"
 
         # Available levels
         if 'levels' in context:
-            levels_str = ", ".join(context['levels'])
-            context_parts.append(f"- Available Levels: {levels_str}")
+            yield f"- Available Levels: {', '.join(context['levels'])}"
 
         # Element counts
         if 'element_counts' in context:
             counts = context['element_counts']
-            counts_str = ", ".join([f"{k} ({v})" for k, v in counts.items()])
-            context_parts.append(f"- Element Types: {counts_str}")
+            yield "- Element Types: " + ", ".join(f"{k} ({v})" for k, v in counts.items())
 
         # Firm standards
-        if 'firm_standards' in context:
-            standards = context['firm_standards']
+        standards = context.get('firm_standards')
+        if standards:
             if 'dimension_offset' in standards:
-                context_parts.append(f"- Dimension Offset: {standards['dimension_offset']}mm")
+                yield f"- Dimension Offset: {standards['dimension_offset']}mm"
             if 'dimension_style' in standards:
-                context_parts.append(f"- Dimension Style: {standards['dimension_style']}")
+                yield f"- Dimension Style: {standards['dimension_style']}"
 
         # Selected elements
         if 'selected_elements' in context:
-            count = context['selected_elements']
-            context_parts.append(f"- Selected Elements: {count}")
+            yield f"- Selected Elements: {context['selected_elements']}"
 
-        context_parts.append("</context>")
-        return "\n".join(context_parts)
+        yield _CONTEXT_FOOTER
 
     def _parse_json_response(self, response_text: str) -> Dict[str, Any]:
         """
@@ -221,21 +467,12 @@ Ambiguous: "Add dimensions"
         Handles cases where Claude wraps JSON in markdown code blocks
         """
         # Remove markdown code blocks if present
-        text = response_text.strip()
-
-        if text.startswith("```json"):
-            text = text[7:]  # Remove ```json
-        elif text.startswith("```"):
-            text = text[3:]  # Remove ```
-
-        if text.endswith("```"):
-            text = text[:-3]  # Remove trailing ```
-
-        text = text.strip()
+        match = _FENCE_RE.match(response_text)
+        text = match.group(1).strip() if match else response_text.strip()
 
         # Parse JSON
         try:
-            action = json.loads(text)
+            action = _json_loads(text)
             return action
         except json.JSONDecodeError as e:
             raise APIError(f"Failed to parse JSON response: {e}\nResponse: {response_text}") from e
@@ -244,17 +481,24 @@ Ambiguous: "Add dimensions"
         """
         Test connection to Claude API
 
+        Uses the models endpoint, which checks the API key in one round-trip
+        without generating (or billing) any tokens.
+
         Returns:
             True if connection successful, False otherwise
         """
         try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=50,
-                messages=[
-                    {"role": "user", "content": "Say 'hello' in JSON: {\"message\": \"hello\"}"}
-                ]
-            )
+            models = getattr(self.client, 'models', None)
+            if models is not None:
+                # Fetches only the first page; iterating would auto-paginate
+                models.list(limit=1)
+            else:
+                # Older SDKs without the models API: smallest possible generation
+                self.client.messages.create(
+                    model=self.model,
+                    max_tokens=1,
+                    messages=[{"role": "user", "content": "."}]
+                )
             return True
         except Exception:
             return False
@@ -287,7 +531,7 @@ def test_claude_client():
         )
 
         print("✓ Hebrew prompt parsed:")
-        print(json.dumps(action, indent=2, ensure_ascii=False))
+        print(_json_dumps(action, indent=True))
 
         return True
 
@@ -4,20 +4,86 @@ Handles loading firm settings and secure API key storage
 """
 
 import os
-import yaml
-from typing import Dict, Any, Optional
-
-# Try to import keyring for secure API key storage
-try:
-    import keyring
-    KEYRING_AVAILABLE = True
-except ImportError:
-    KEYRING_AVAILABLE = False
+import re
+import json
+import threading
+import importlib.util
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Mapping, Tuple, Union, IO
+
+# Check for keyring (secure API key storage) without importing it; yaml and
+# keyring are imported on first use to keep pyRevit button start-up cheap
+KEYRING_AVAILABLE = importlib.util.find_spec('keyring') is not None
+if not KEYRING_AVAILABLE:
     print("Warning: keyring not available. API key will be stored in environment variable.")
 
 from exceptions import ConfigurationError
 
 
+# Sentinel for "API key not looked up yet" (None means "looked up, not found")
+_MISSING = object()
+
+# config/firm_defaults.yaml in the extension folder (this file is in lib/)
+_DEFAULT_CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'config',
+    'firm_defaults.yaml'
+)
+
+# Shape of an Anthropic API key
+_KEY_RE = re.compile(r'^sk-ant-[A-Za-z0-9_-]{32,}$')
+
+# Session variable holding the keyring lookup result as a 1-tuple (so a
+# "not found" result is cached too), shared by the managers of all clicks
+_SESSION_API_KEY = '_revitai_api_key'
+
+# Session variable holding the parse cache, so it survives pyRevit
+# re-importing this module on every click
+_SESSION_PARSE_CACHE = '_revitai_config_parse_cache'
+
+# Parsed configurations keyed by (absolute path, mtime_ns, size), shared by
+# all ConfigManager instances; values are (config, flat view) pairs
+# (see _get_parse_cache)
+_parse_cache: Optional[Dict[Tuple[str, int, int], Tuple[Dict[str, Any], Mapping[str, Any]]]] = None
+
+
+def _get_parse_cache() -> Dict[Tuple[str, int, int], Tuple[Dict[str, Any], Mapping[str, Any]]]:
+    """Get the parse cache shared by all ConfigManager instances in the session"""
+    global _parse_cache
+    if _parse_cache is None:
+        _parse_cache = get_session_object(_SESSION_PARSE_CACHE)
+        if _parse_cache is None:
+            _parse_cache = {}
+            set_session_object(_SESSION_PARSE_CACHE, _parse_cache)
+    return _parse_cache
+
+
+def _flatten(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Flatten a nested config into dot-notation keys
+
+    Every level is kept, so both "api_settings.model" and "api_settings"
+    (the nested dict itself) resolve. Walks the nesting with an explicit
+    stack, so deep configs cannot hit the recursion limit.
+
+    Args:
+        config: Nested configuration dictionary
+
+    Returns:
+        Flat dictionary mapping dotted keys to values
+    """
+    flat = {}
+    stack = [('', config)]
+    while stack:
+        prefix, mapping = stack.pop()
+        for key, value in mapping.items():
+            dotted = f"{prefix}{key}"
+            flat[dotted] = value
+            if isinstance(value, dict):
+                stack.append((dotted + '.', value))
+    return flat
+
+
 class ConfigManager:
     """
     Manages configuration loading and API key storage
@@ -28,26 +94,36 @@ class ConfigManager:
     3. firm_defaults.yaml (for all other settings)
     """
 
+    __slots__ = ('config_path', '_source', '_config', '_flat_config', '_api_key_cache', '_env_api_key')
+
     # Keyring service name
     SERVICE_NAME = "RevitAI"
     API_KEY_NAME = "claude_api_key"
 
-    def __init__(self, config_path: Optional[str] = None):
+    def __init__(self, config_path: Union[str, bytes, IO, None] = None):
         """
         Initialize configuration manager
 
         Args:
             config_path: Path to firm_defaults.yaml (optional)
-                        Defaults to config/firm_defaults.yaml in extension folder
+                        Defaults to config/firm_defaults.yaml in extension folder.
+                        A YAML document as bytes or a file-like object is
+                        parsed in memory instead (config_path is then None).
         """
-        if config_path is None:
-            # Default path relative to this file
-            lib_dir = os.path.dirname(os.path.abspath(__file__))
-            extension_dir = os.path.dirname(lib_dir)
-            config_path = os.path.join(extension_dir, 'config', 'firm_defaults.yaml')
-
-        self.config_path = config_path
+        if isinstance(config_path, (bytes, bytearray)) or hasattr(config_path, 'read'):
+            self.config_path = None
+            self._source = config_path
+        else:
+            self.config_path = config_path or _DEFAULT_CONFIG_PATH
+            self._source = None
         self._config = None
+        self._flat_config = None
+        self._api_key_cache = _MISSING
+        self._env_api_key = os.environ.get('CLAUDE_API_KEY')
+
+    def refresh_env(self) -> None:
+        """Re-read CLAUDE_API_KEY after the environment has changed"""
+        self._env_api_key = os.environ.get('CLAUDE_API_KEY')
 
     def load_config(self) -> Dict[str, Any]:
         """
@@ -62,8 +138,15 @@ class ConfigManager:
         if self._config is not None:
             return self._config
 
+        # In-memory document: nothing to stat or cache
+        if self._source is not None:
+            self._set_config(self._parse_yaml(self._source))
+            return self._config
+
         # Check if config file exists
-        if not os.path.exists(self.config_path):
+        try:
+            st = os.stat(self.config_path)
+        except FileNotFoundError:
             # Try example file
             example_path = self.config_path.replace('.yaml', '.example.yaml')
             if os.path.exists(example_path):
@@ -76,21 +159,157 @@ class ConfigManager:
                     f"Configuration file not found: {self.config_path}"
                 )
 
-        # Load YAML
+        # Nothing to parse in an empty file
+        if st.st_size == 0:
+            raise ConfigurationError("Configuration file is empty")
+
+        # Reuse a configuration already parsed in this process if the file
+        # is unchanged
+        parse_key = (os.path.abspath(self.config_path), st.st_mtime_ns, st.st_size)
+        parse_cache = _get_parse_cache()
+        parsed = parse_cache.get(parse_key)
+        if parsed is not None:
+            self._config, self._flat_config = parsed
+            return self._config
+
+        # Reuse the parsed JSON sidecar if it was written for this exact file
+        cached = self._load_json_cache(st)
+        if cached is not None:
+            self._set_config(cached)
+            parse_cache[parse_key] = (self._config, self._flat_config)
+            return self._config
+
+        # Read the whole file in one call sized from fstat (no io buffering
+        # layer) and parse the bytes; libyaml detects the encoding itself
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                self._config = yaml.safe_load(f)
+            fd = os.open(self.config_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+            try:
+                data = os.read(fd, os.fstat(fd).st_size)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            raise ConfigurationError(f"Failed to load configuration: {e}") from e
 
-            if not self._config:
-                raise ConfigurationError("Configuration file is empty")
+        config = self._parse_yaml(data)
 
-            return self._config
+        self._set_config(config)
+        self._write_json_cache(config, st)
+        parse_cache[parse_key] = (self._config, self._flat_config)
+        return self._config
+
+    @staticmethod
+    def _parse_yaml(stream: Union[bytes, IO]) -> Dict[str, Any]:
+        """
+        Parse a YAML configuration document
 
+        Args:
+            stream: YAML document as bytes or an open file-like object
+
+        Returns:
+            Configuration dictionary
+
+        Raises:
+            ConfigurationError: If the document is invalid, empty or not a mapping
+        """
+        # Prefer the libyaml-backed loader when available
+        import yaml
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+        try:
+            config = yaml.load(stream, Loader=loader)
         except yaml.YAMLError as e:
             raise ConfigurationError(f"Invalid YAML in configuration file: {e}") from e
         except Exception as e:
             raise ConfigurationError(f"Failed to load configuration: {e}") from e
 
+        ConfigManager._check_config(config)
+        return config
+
+    @staticmethod
+    def _check_config(config: Any) -> None:
+        """
+        Check that a loaded configuration is a non-empty mapping
+
+        Raises:
+            ConfigurationError: If the configuration is empty or not a mapping
+        """
+        if not config:
+            raise ConfigurationError("Configuration file is empty")
+        if not isinstance(config, dict):
+            raise ConfigurationError("Configuration file must contain a mapping of settings")
+
+    @staticmethod
+    def clear_cache() -> None:
+        """Forget configurations parsed by any ConfigManager in this process"""
+        _get_parse_cache().clear()
+
+    def _set_config(self, config: Dict[str, Any]) -> None:
+        """Store the loaded configuration and its flattened dot-notation view"""
+        self._config = config
+        self._flat_config = MappingProxyType(_flatten(config))
+
+    @property
+    def cache_path(self) -> str:
+        """Path of the JSON sidecar caching the parsed configuration"""
+        return self.config_path + '.cache.json'
+
+    def _load_json_cache(self, source_stat: os.stat_result) -> Optional[Dict[str, Any]]:
+        """
+        Load the parsed configuration from the JSON sidecar
+
+        The sidecar records the mtime and size of the YAML it was parsed
+        from; it is used only if both match the YAML's current stat exactly
+        (a restored older file or an edit within the same mtime tick then
+        still gets parsed).
+
+        Args:
+            source_stat: Current stat of the YAML file
+
+        Returns:
+            Cached configuration, or None if the sidecar is missing, stale,
+            unreadable or does not hold a valid configuration
+        """
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            if (payload['mtime_ns'] != source_stat.st_mtime_ns
+                    or payload['size'] != source_stat.st_size):
+                return None
+            config = payload['config']
+            self._check_config(config)
+            return config
+        except (OSError, ValueError, TypeError, KeyError, ConfigurationError):
+            return None
+
+    def _write_json_cache(self, config: Dict[str, Any], source_stat: os.stat_result) -> None:
+        """
+        Write the parsed configuration to the JSON sidecar
+
+        Skipped when the configuration does not survive a JSON round-trip
+        (e.g. dates or non-string keys). Failures are ignored since the
+        sidecar is only an optimization (the config folder may be read-only).
+
+        Args:
+            config: Parsed configuration
+            source_stat: Stat of the YAML file it was parsed from
+        """
+        try:
+            payload = {
+                'mtime_ns': source_stat.st_mtime_ns,
+                'size': source_stat.st_size,
+                'config': config,
+            }
+            text = json.dumps(payload, ensure_ascii=False)
+            if json.loads(text) != payload:
+                return
+
+            # Write to a temp file and swap it in so readers never see a partial file
+            tmp_path = self.cache_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, self.cache_path)
+        except (OSError, TypeError, ValueError):
+            pass
+
     def get(self, key: str, default: Any = None) -> Any:
         """
         Get configuration value by key
@@ -102,19 +321,11 @@ class ConfigManager:
         Returns:
             Configuration value or default
         """
-        config = self.load_config()
-
-        # Support dot notation for nested keys
-        keys = key.split('.')
-        value = config
-
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
+        if self._flat_config is None:
+            self.load_config()
 
-        return value
+        # Dot-notation keys were flattened at load time
+        return self._flat_config.get(key, default)
 
     def get_api_key(self) -> Optional[str]:
         """
@@ -125,29 +336,61 @@ class ConfigManager:
         2. Windows Credential Manager (keyring)
         3. None if not found
 
+        A malformed key in the Credential Manager is treated as not found,
+        so the user is asked to enter it again.
+
+        The environment variable is read once when the manager is created
+        (see refresh_env). The keyring result (including "not found") is
+        cached on the instance and for the Revit session, so keyring is
+        queried at most once per session until the key is set or deleted.
+
         Returns:
             API key string or None
         """
         # Check environment variable first
-        api_key = os.environ.get('CLAUDE_API_KEY')
-        if api_key:
-            return api_key
+        if self._env_api_key:
+            return self._env_api_key
+
+        if self._api_key_cache is not _MISSING:
+            return self._api_key_cache
+
+        # Looked up by an earlier click in this session
+        cached = get_session_object(_SESSION_API_KEY)
+        if cached is not None:
+            self._api_key_cache = cached[0]
+            return self._api_key_cache
 
         # Check Windows Credential Manager
         if KEYRING_AVAILABLE:
             try:
+                import keyring
                 api_key = keyring.get_password(self.SERVICE_NAME, self.API_KEY_NAME)
-                return api_key
             except Exception as e:
+                # Not cached: keyring failures may be transient
                 print(f"Warning: Failed to retrieve API key from keyring: {e}")
                 return None
+            if api_key and not _KEY_RE.match(api_key):
+                print("Warning: Stored API key is not a valid Anthropic API key. Please set it again.")
+                api_key = None
+        else:
+            api_key = None
 
-        return None
+        self._api_key_cache = api_key
+        set_session_object(_SESSION_API_KEY, (api_key,))
+        return api_key
+
+    def _forget_api_key(self) -> None:
+        """Drop the cached keyring result (instance and session)"""
+        self._api_key_cache = _MISSING
+        set_session_object(_SESSION_API_KEY, None)
 
     def set_api_key(self, api_key: str) -> bool:
         """
         Store Claude API key in secure storage
 
+        A key not shaped like an Anthropic API key is rejected (not stored),
+        since get_api_key would treat it as not configured.
+
         Args:
             api_key: The API key to store
 
@@ -157,13 +400,16 @@ class ConfigManager:
         if not api_key or not isinstance(api_key, str):
             raise ValueError("API key must be a non-empty string")
 
-        # Validate API key format (basic check)
-        if not api_key.startswith('sk-'):
-            print("Warning: API key doesn't start with 'sk-'. This may not be a valid Anthropic API key.")
+        # Validate API key format
+        if not _KEY_RE.match(api_key):
+            print("Error: API key doesn't look like an Anthropic API key (sk-ant-...). It was not stored.")
+            return False
 
         # Store in Windows Credential Manager
         if KEYRING_AVAILABLE:
+            self._forget_api_key()
             try:
+                import keyring
                 keyring.set_password(self.SERVICE_NAME, self.API_KEY_NAME, api_key)
                 return True
             except Exception as e:
@@ -184,7 +430,9 @@ class ConfigManager:
             True if successful, False otherwise
         """
         if KEYRING_AVAILABLE:
+            self._forget_api_key()
             try:
+                import keyring
                 keyring.delete_password(self.SERVICE_NAME, self.API_KEY_NAME)
                 return True
             except Exception:
@@ -202,13 +450,79 @@ class ConfigManager:
         return api_key is not None and len(api_key) > 0
 
 
-# Global config manager instance
+def _session_store():
+    """pyRevit's per-session variable store (pyrevit.script), or None outside pyRevit"""
+    try:
+        from pyrevit import script
+    except Exception:
+        return None
+    return script
+
+
+def get_session_object(name: str) -> Any:
+    """
+    Get an object stored for the current Revit session
+
+    pyRevit re-imports lib modules on every button click, so module globals
+    are reset between clicks. Objects worth keeping for the whole session are
+    stored as pyRevit session variables (script.get_envvar/set_envvar), which
+    live for as long as Revit runs.
+
+    Args:
+        name: Session variable the object was stored under
+
+    Returns:
+        Stored object, or None if not stored or running outside pyRevit
+    """
+    script = _session_store()
+    if script is None:
+        return None
+    try:
+        return script.get_envvar(name)
+    except Exception:
+        return None
+
+
+def set_session_object(name: str, value: Any) -> None:
+    """
+    Store an object for the current Revit session (no-op outside pyRevit)
+
+    Args:
+        name: Session variable to store the object under
+        value: Object to store
+    """
+    script = _session_store()
+    if script is None:
+        return
+    try:
+        script.set_envvar(name, value)
+    except Exception as e:
+        print(f"Warning: Failed to store session variable {name}: {e}")
+
+
+# Global config manager instance. The manager itself is not kept for the
+# session, only the parse cache and the keyring lookup are: a new manager
+# per import re-checks the file's mtime and size, so edits made through
+# Settings are picked up on the next click, while keyring is not queried
+# again until the key is set or deleted.
 _config_manager = None
 
+# Guards creation of the global instance (not taken once it exists)
+_config_manager_lock = threading.Lock()
+
 
 def get_config_manager() -> ConfigManager:
     """Get global configuration manager instance (singleton pattern)"""
     global _config_manager
     if _config_manager is None:
-        _config_manager = ConfigManager()
+        with _config_manager_lock:
+            if _config_manager is None:
+                _config_manager = ConfigManager()
     return _config_manager
+
+
+def reset_config_manager() -> None:
+    """Drop the global configuration manager (e.g. between tests)"""
+    global _config_manager
+    with _config_manager_lock:
+        _config_manager = None
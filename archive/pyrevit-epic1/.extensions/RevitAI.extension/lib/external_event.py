@@ -5,14 +5,15 @@ This module implements the ExternalEvent pattern to allow background threads
 (e.g., Claude API calls) to safely execute Revit API operations on the main thread.
 """
 
+import logging
 import threading
-from typing import Callable, Any, Optional
-from queue import Queue, Empty
+from typing import Callable, Any, Optional, Iterable, List, Tuple, Dict
+from queue import Queue, Full, Empty
 
 # Revit API imports
 try:
     from Autodesk.Revit.UI import IExternalEventHandler, ExternalEvent, Result
-    from Autodesk.Revit.DB import Transaction
+    from Autodesk.Revit.DB import Transaction, FilteredElementCollector, BuiltInCategory, TextNote
     REVIT_API_AVAILABLE = True
 except ImportError:
     REVIT_API_AVAILABLE = False
@@ -24,6 +25,50 @@ from exceptions import RevitAPIError
 
 logger = get_logger(__name__)
 
+# Bound on requests waiting for the main thread, and how long a producer
+# waits for room before giving up (seconds)
+MAX_PENDING_REQUESTS = 64
+ENQUEUE_TIMEOUT = 5.0
+
+
+class _Completion:
+    """Completion signal and result slots, reused across requests"""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def reset(self):
+        """Clear the signal and slots for reuse"""
+        self.done.clear()
+        self.result = None
+        self.error = None
+
+
+# Per-thread free list of idle _Completion objects
+_completion_pool = threading.local()
+
+
+def _acquire_completion() -> _Completion:
+    """Take an idle completion from this thread's pool, or create one"""
+    free = getattr(_completion_pool, 'free', None)
+    if free:
+        return free.pop()
+    return _Completion()
+
+
+def _release_completion(completion: _Completion) -> None:
+    """Reset a finished completion and return it to this thread's pool"""
+    free = getattr(_completion_pool, 'free', None)
+    if free is None:
+        free = _completion_pool.free = []
+    if len(free) < MAX_PENDING_REQUESTS:
+        completion.reset()
+        free.append(completion)
+
 
 class RevitOperationRequest:
     """
@@ -33,29 +78,48 @@ class RevitOperationRequest:
         operation: Callable function to execute
         args: Positional arguments for the operation
         kwargs: Keyword arguments for the operation
-        result_queue: Queue to receive the result
+
+    The completion signal comes from a per-thread pool and goes back to it
+    once wait_for_result has read the outcome; the outcome itself is kept on
+    the request, so later wait_for_result calls return (or raise) it again.
     """
 
+    __slots__ = ('operation', 'args', 'kwargs', '_completion', '_result', '_error')
+
     def __init__(self, operation: Callable, *args, **kwargs):
         self.operation = operation
         self.args = args
         self.kwargs = kwargs
-        self.result_queue = Queue(maxsize=1)
-        self.exception = None
+        self._completion = _acquire_completion()
+        self._result = None
+        self._error = None
 
-    def execute(self, uidoc) -> Any:
+    def execute(self, uidoc, doc) -> Any:
         """
         Execute the operation and store result or exception
 
         Args:
             uidoc: Revit UIDocument
+            doc: Revit Document of uidoc
         """
+        completion = self._completion
         try:
-            result = self.operation(uidoc, *self.args, **self.kwargs)
-            self.result_queue.put(('success', result))
+            completion.result = self.operation(uidoc, doc, *self.args, **self.kwargs)
         except Exception as e:
-            self.exception = e
-            self.result_queue.put(('error', e))
+            completion.error = e
+        finally:
+            completion.done.set()
+
+    def set_exception(self, error: Exception) -> None:
+        """
+        Complete the request with an error without running the operation
+
+        Args:
+            error: Exception to deliver to the waiting caller
+        """
+        completion = self._completion
+        completion.error = error
+        completion.done.set()
 
     def wait_for_result(self, timeout: Optional[float] = None) -> Any:
         """
@@ -71,16 +135,19 @@ class RevitOperationRequest:
             RevitAPIError: If operation failed
             TimeoutError: If timeout exceeded
         """
-        try:
-            status, value = self.result_queue.get(timeout=timeout)
+        completion = self._completion
+        if completion is not None:
+            if not completion.done.wait(timeout):
+                # Not recycled: the main thread may still complete it
+                raise TimeoutError(f"Revit operation timed out after {timeout} seconds")
 
-            if status == 'success':
-                return value
-            else:
-                raise RevitAPIError(f"Revit operation failed: {value}") from None
+            self._result, self._error = completion.result, completion.error
+            self._completion = None
+            _release_completion(completion)
 
-        except Empty:
-            raise TimeoutError(f"Revit operation timed out after {timeout} seconds") from None
+        if self._error is not None:
+            raise RevitAPIError(f"Revit operation failed: {self._error}") from None
+        return self._result
 
 
 class RevitExternalEventHandler(IExternalEventHandler):
@@ -88,13 +155,22 @@ class RevitExternalEventHandler(IExternalEventHandler):
     IExternalEventHandler implementation for executing Revit operations
 
     This handler processes operation requests from the request queue
-    and executes them on the Revit main thread.
+    and executes them on the Revit main thread. Each Execute call drains
+    every queued request, so one Raise() can serve several operations.
+
+    The queue holds at most max_pending requests; when the main thread
+    falls behind, producers block for up to ENQUEUE_TIMEOUT seconds and
+    then get a RevitAPIError instead of growing the queue without bound.
     """
 
-    def __init__(self):
-        """Initialize the event handler with a request queue"""
-        self.request_queue = Queue()
-        self.current_request = None
+    def __init__(self, max_pending: int = MAX_PENDING_REQUESTS):
+        """
+        Initialize the event handler with a bounded request queue
+
+        Args:
+            max_pending: Maximum number of queued requests
+        """
+        self.request_queue = Queue(maxsize=max_pending)
 
     def Execute(self, uiapp):
         """
@@ -106,24 +182,51 @@ class RevitExternalEventHandler(IExternalEventHandler):
         Returns:
             Result.Succeeded or Result.Failed
         """
-        try:
-            # Get the current request
-            if self.current_request is None:
-                return Result.Failed
+        # Take every pending request first, so none is left behind to run
+        # against whatever document is active at the next Raise()
+        requests = self._drain_requests()
 
-            # Execute the request
+        try:
             uidoc = uiapp.ActiveUIDocument
-            self.current_request.execute(uidoc)
-
-            # Clear current request
-            self.current_request = None
-
-            return Result.Succeeded
-
+            doc = uidoc.Document if uidoc is not None else None
+            if doc is None:
+                raise RevitAPIError("No active Revit document")
         except Exception as e:
             print(f"Error in ExternalEvent.Execute: {e}")
+            # Deliver the error to every caller instead of letting them time out
+            for request in requests:
+                request.set_exception(e)
+            self._mark_done(requests)
             return Result.Failed
 
+        # Execute every pending request (each stores its own result/error)
+        for request in requests:
+            request.execute(uidoc, doc)
+        self._mark_done(requests)
+
+        return Result.Succeeded
+
+    def _drain_requests(self) -> List[RevitOperationRequest]:
+        """
+        Remove and return all queued requests
+
+        Uses only the public Queue API (at most max_pending get_nowait()
+        calls); Execute calls task_done() for each request once it has
+        completed, so join() bookkeeping stays intact.
+        """
+        queue = self.request_queue
+        requests = []
+        while True:
+            try:
+                requests.append(queue.get_nowait())
+            except Empty:
+                return requests
+
+    def _mark_done(self, requests: List[RevitOperationRequest]) -> None:
+        """Mark drained requests as processed for Queue.join()"""
+        for _ in requests:
+            self.request_queue.task_done()
+
     def GetName(self):
         """Return name for debugging purposes"""
         return "RevitAI External Event Handler"
@@ -133,16 +236,24 @@ class RevitExternalEventHandler(IExternalEventHandler):
         Queue an operation for execution on the Revit main thread
 
         Args:
-            operation: Callable that takes (uidoc, *args, **kwargs)
+            operation: Callable that takes (uidoc, doc, *args, **kwargs)
             *args: Positional arguments for the operation
             **kwargs: Keyword arguments for the operation
 
         Returns:
             RevitOperationRequest that can be used to wait for result
+
+        Raises:
+            RevitAPIError: If the queue stays full for ENQUEUE_TIMEOUT seconds
         """
         request = RevitOperationRequest(operation, *args, **kwargs)
-        self.request_queue.put(request)
-        self.current_request = request
+        try:
+            self.request_queue.put(request, timeout=ENQUEUE_TIMEOUT)
+        except Full:
+            raise RevitAPIError(
+                f"Too many pending Revit operations ({self.request_queue.maxsize}); "
+                f"the Revit main thread is not keeping up"
+            ) from None
         return request
 
 
@@ -201,7 +312,7 @@ class RevitEventManager:
         for it to complete on the Revit main thread.
 
         Args:
-            operation: Callable that takes (uidoc, *args, **kwargs)
+            operation: Callable that takes (uidoc, doc, *args, **kwargs)
             timeout: Maximum time to wait for operation (seconds)
             *args: Positional arguments for the operation
             **kwargs: Keyword arguments for the operation
@@ -215,10 +326,12 @@ class RevitEventManager:
         """
         if not REVIT_API_AVAILABLE or self.external_event is None:
             # Development mode - execute directly (no threading)
-            logger.warning(
-                f"DEVELOPMENT MODE: Skipping Revit operation '{operation.__name__}' - "
-                f"Revit API not available. This may cause unexpected behavior."
-            )
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning(
+                    "DEVELOPMENT MODE: Skipping Revit operation '%s' - "
+                    "Revit API not available. This may cause unexpected behavior.",
+                    operation.__name__
+                )
             return None
 
         # Queue the operation
@@ -230,20 +343,82 @@ class RevitEventManager:
         # Wait for result
         return request.wait_for_result(timeout=timeout)
 
+    def execute_batch_on_main_thread(
+        self,
+        operations: Iterable[Tuple[Callable, tuple, Dict[str, Any]]],
+        timeout: float = 30.0
+    ) -> List[Any]:
+        """
+        Execute several Revit operations with a single main-thread round-trip
+
+        All operations are queued before the external event is raised once;
+        the handler then runs them in order in the same Execute callback.
+
+        Args:
+            operations: (operation, args, kwargs) tuples; each operation
+                        takes (uidoc, doc, *args, **kwargs)
+            timeout: Maximum time to wait for each operation (seconds)
+
+        Returns:
+            Results in the same order as operations
+
+        Raises:
+            RevitAPIError: If a Revit operation fails
+            TimeoutError: If an operation times out
+
+        Every request is awaited before the first error is raised. After a
+        timeout the remaining requests are only collected if already done
+        (the main thread is evidently not keeping up).
+        """
+        operations = list(operations)
+
+        if not REVIT_API_AVAILABLE or self.external_event is None:
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning(
+                    "DEVELOPMENT MODE: Skipping %d Revit operations - "
+                    "Revit API not available. This may cause unexpected behavior.",
+                    len(operations)
+                )
+            return [None] * len(operations)
+
+        # Queue every operation, then raise once (even if queueing failed
+        # part way, so the requests already queued still run)
+        requests = []
+        try:
+            for operation, args, kwargs in operations:
+                requests.append(self.event_handler.queue_operation(operation, *args, **kwargs))
+        finally:
+            if requests:
+                self.external_event.Raise()
+
+        results = []
+        first_error = None
+        for request in requests:
+            try:
+                results.append(request.wait_for_result(timeout=timeout))
+            except (RevitAPIError, TimeoutError) as e:
+                results.append(None)
+                if first_error is None:
+                    first_error = e
+                if isinstance(e, TimeoutError):
+                    timeout = 0
+
+        if first_error is not None:
+            raise first_error
+        return results
+
     def is_available(self) -> bool:
         """Check if event manager is ready to execute operations"""
         return REVIT_API_AVAILABLE and self.external_event is not None
 
 
-# Global event manager instance
-_event_manager = None
+# Global event manager instance, created at import so concurrent callers
+# can never race to create two
+_event_manager = RevitEventManager()
 
 
 def get_event_manager() -> RevitEventManager:
     """Get global event manager instance (singleton pattern)"""
-    global _event_manager
-    if _event_manager is None:
-        _event_manager = RevitEventManager()
     return _event_manager
 
 
@@ -253,47 +428,41 @@ def initialize_event_manager(external_event):
 
     Call this during plugin initialization after creating the ExternalEvent.
     """
-    manager = get_event_manager()
-    manager.initialize(external_event)
+    _event_manager.initialize(external_event)
 
 
 # Example usage functions
 
-def example_get_all_rooms(uidoc):
+def example_get_all_rooms(uidoc, doc):
     """
     Example operation: Get all rooms in current document
 
     Args:
         uidoc: Revit UIDocument
+        doc: Revit Document
 
     Returns:
         List of room elements
     """
-    from Autodesk.Revit.DB import FilteredElementCollector, BuiltInCategory
-
-    doc = uidoc.Document
     collector = FilteredElementCollector(doc)
     rooms = collector.OfCategory(BuiltInCategory.OST_Rooms).ToElements()
 
     return list(rooms)
 
 
-def example_create_text_note(uidoc, text: str, location):
+def example_create_text_note(uidoc, doc, text: str, location):
     """
     Example operation: Create a text note
 
     Args:
         uidoc: Revit UIDocument
+        doc: Revit Document
         text: Text content
         location: XYZ location for the note
 
     Returns:
         Created TextNote element
     """
-    from Autodesk.Revit.DB import Transaction, TextNote
-
-    doc = uidoc.Document
-
     with Transaction(doc, "AI: Create Text Note") as t:
         t.Start()
         try:
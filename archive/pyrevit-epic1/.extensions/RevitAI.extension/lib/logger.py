@@ -4,15 +4,22 @@ Provides structured logging for all RevitAI operations
 """
 
 import os
+import queue
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
-from datetime import datetime
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+import copy
+import time
+import functools
 from typing import Optional
 import sys
 
 from config_manager import get_config_manager
 
 
+# Context keys never written to the log
+_SENSITIVE_KEYS = frozenset({'project_name', 'user_name'})
+
 # Log levels
 DEBUG = logging.DEBUG
 INFO = logging.INFO
@@ -20,10 +27,38 @@ WARNING = logging.WARNING
 ERROR = logging.ERROR
 CRITICAL = logging.CRITICAL
 
+# Configured level names (logging.log_level) to logging levels
+_LEVELS = {
+    'DEBUG': DEBUG,
+    'INFO': INFO,
+    'WARNING': WARNING,
+    'ERROR': ERROR,
+    'CRITICAL': CRITICAL,
+}
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves traceback formatting to the file handler
+
+    The stock prepare() formats the whole record, traceback included, on the
+    calling thread and clears exc_info on the shared record. Here only the
+    message arguments are merged (so later mutation of the arguments cannot
+    change the logged text); exc_info travels with a copy of the record and
+    is rendered on the listener thread when the record is written.
+    """
 
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+@functools.lru_cache(maxsize=1)
 def get_log_directory() -> str:
     """
-    Get the log directory path
+    Get the log directory path (created on first call, then cached)
 
     Returns:
         Path to logs directory
@@ -37,12 +72,12 @@ def get_log_directory() -> str:
         log_dir = os.path.join(os.path.expanduser('~'), '.revit-ai', 'logs')
 
     # Create directory if it doesn't exist
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir, exist_ok=True)
+    os.makedirs(log_dir, exist_ok=True)
 
     return log_dir
 
 
+@functools.lru_cache(maxsize=1)
 def get_log_file_path() -> str:
     """
     Get the main log file path
@@ -63,7 +98,7 @@ def setup_logger(
     backup_count: int = 5
 ) -> logging.Logger:
     """
-    Set up a logger with rotating file handler
+    Set up a logger with a rotating file handler written off the calling thread
 
     Args:
         name: Logger name
@@ -98,21 +133,27 @@ def setup_logger(
         )
 
         # Create formatter
-        formatter = logging.Formatter(
+        file_handler.setFormatter(logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        file_handler.setFormatter(formatter)
+        ))
+
+        # File I/O happens on a background listener thread; the calling
+        # (Revit UI) thread only enqueues records. Each record is written as
+        # soon as the listener takes it, so "View Logs" is never stale.
+        # Stopping the listener at exit drains the queue.
+        log_queue = queue.Queue(-1)
+        listener = QueueListener(log_queue, file_handler)
+        listener.start()
+        atexit.register(listener.stop)
+        logger._listener = listener
 
         # Add handler to logger
-        logger.addHandler(file_handler)
+        logger.addHandler(_DeferredQueueHandler(log_queue))
 
     except Exception as e:
-        # If file logging fails, fall back to console only
+        # If file logging fails, fall back to the console handler below
         print(f"Warning: Could not set up file logging: {e}")
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
 
     # Also log to console (pyRevit output window)
     console_handler = logging.StreamHandler(sys.stdout)
@@ -125,9 +166,10 @@ def setup_logger(
     return logger
 
 
+@functools.lru_cache(maxsize=8)
 def get_logger(name: str = 'RevitAI') -> logging.Logger:
     """
-    Get logger instance (creates if doesn't exist)
+    Get logger instance (creates if doesn't exist, then cached per name)
 
     Args:
         name: Logger name
@@ -143,7 +185,7 @@ def get_logger(name: str = 'RevitAI') -> logging.Logger:
         config = get_config_manager()
         try:
             log_level_str = config.get('logging.log_level', 'INFO')
-            log_level = getattr(logging, log_level_str.upper(), INFO)
+            log_level = _LEVELS.get(log_level_str.upper(), INFO)
         except Exception:
             log_level = INFO
 
@@ -161,6 +203,11 @@ def get_logger(name: str = 'RevitAI') -> logging.Logger:
     return logger
 
 
+def _format_context(context: dict) -> str:
+    """Format keyword context as 'key=value, ...' for log messages"""
+    return ", ".join(f"{k}={v}" for k, v in context.items())
+
+
 class OperationLogger:
     """
     Helper class for logging operations with context
@@ -171,6 +218,8 @@ class OperationLogger:
     - Error tracking
     """
 
+    __slots__ = ('operation_name', 'logger', '_t0')
+
     def __init__(self, operation_name: str, logger: Optional[logging.Logger] = None):
         """
         Initialize operation logger
@@ -181,8 +230,7 @@ class OperationLogger:
         """
         self.operation_name = operation_name
         self.logger = logger or get_logger()
-        self.start_time = None
-        self.end_time = None
+        self._t0 = None
 
     def start(self, **context):
         """
@@ -191,10 +239,10 @@ class OperationLogger:
         Args:
             **context: Additional context to log
         """
-        self.start_time = datetime.now()
+        self._t0 = time.perf_counter()
 
-        context_str = ", ".join([f"{k}={v}" for k, v in context.items()])
-        self.logger.info(f"[START] {self.operation_name} | {context_str}")
+        if self.logger.isEnabledFor(INFO):
+            self.logger.info("[START] %s | %s", self.operation_name, _format_context(context))
 
     def end(self, success: bool = True, **context):
         """
@@ -204,19 +252,20 @@ class OperationLogger:
             success: Whether operation succeeded
             **context: Additional context to log (e.g., result count)
         """
-        self.end_time = datetime.now()
+        if not self.logger.isEnabledFor(INFO):
+            return
 
-        if self.start_time:
-            duration = (self.end_time - self.start_time).total_seconds()
-            duration_str = f"{duration:.2f}s"
+        if self._t0 is not None:
+            duration = time.perf_counter() - self._t0
+            duration_str = f"{duration:.3f}s"
         else:
             duration_str = "unknown"
 
         status = "SUCCESS" if success else "FAILED"
-        context_str = ", ".join([f"{k}={v}" for k, v in context.items()])
 
         self.logger.info(
-            f"[END] {self.operation_name} | status={status}, duration={duration_str} | {context_str}"
+            "[END] %s | status=%s, duration=%s | %s",
+            self.operation_name, status, duration_str, _format_context(context)
         )
 
     def error(self, exception: Exception, **context):
@@ -227,12 +276,12 @@ class OperationLogger:
             exception: Exception that occurred
             **context: Additional context
         """
-        context_str = ", ".join([f"{k}={v}" for k, v in context.items()])
-
-        self.logger.error(
-            f"[ERROR] {self.operation_name} | {exception.__class__.__name__}: {exception} | {context_str}",
-            exc_info=True
-        )
+        if self.logger.isEnabledFor(ERROR):
+            self.logger.error(
+                "[ERROR] %s | %s: %s | %s",
+                self.operation_name, exception.__class__.__name__, exception, _format_context(context),
+                exc_info=True
+            )
 
         # Also end the operation as failed
         self.end(success=False, error=str(exception))
@@ -260,18 +309,21 @@ def log_llm_request(prompt: str, context: dict, response: dict, duration: float)
     """
     logger = get_logger()
 
-    # Anonymize sensitive data
-    safe_prompt = prompt[:100] + "..." if len(prompt) > 100 else prompt
-    safe_context = {k: v for k, v in context.items() if k not in ['project_name', 'user_name']}
-
     logger.info(
-        f"[LLM] Request completed | duration={duration:.2f}s | "
-        f"prompt_length={len(prompt)} | operation={response.get('operation', 'unknown')}"
+        "[LLM] Request completed | duration=%.2fs | prompt_length=%d | operation=%s",
+        duration, len(prompt), response.get('operation', 'unknown')
     )
 
-    logger.debug(f"[LLM] Prompt: {safe_prompt}")
-    logger.debug(f"[LLM] Context: {safe_context}")
-    logger.debug(f"[LLM] Response: {response}")
+    if not logger.isEnabledFor(DEBUG):
+        return
+
+    # Anonymize sensitive data
+    safe_prompt = prompt[:100] + "..." if len(prompt) > 100 else prompt
+    safe_context = {k: v for k, v in context.items() if k not in _SENSITIVE_KEYS}
+
+    logger.debug("[LLM] Prompt: %s", safe_prompt)
+    logger.debug("[LLM] Context: %s", safe_context)
+    logger.debug("[LLM] Response: %s", response)
 
 
 def log_revit_operation(operation_type: str, element_count: int, success: bool, error: Optional[str] = None):
@@ -286,16 +338,14 @@ def log_revit_operation(operation_type: str, element_count: int, success: bool,
     """
     logger = get_logger()
 
+    level = INFO if success else ERROR
     status = "SUCCESS" if success else "FAILED"
-    log_message = f"[REVIT] {operation_type} | status={status}, elements={element_count}"
 
     if error:
-        log_message += f" | error={error}"
-
-    if success:
-        logger.info(log_message)
+        logger.log(level, "[REVIT] %s | status=%s, elements=%s | error=%s",
+                   operation_type, status, element_count, error)
     else:
-        logger.error(log_message)
+        logger.log(level, "[REVIT] %s | status=%s, elements=%s", operation_type, status, element_count)
 
 
 def test_logger():
@@ -315,7 +365,6 @@ def test_logger():
     op_logger.start(user="test", scope="current_view")
 
     # Simulate some work
-    import time
     time.sleep(0.1)
 
     op_logger.end(success=True, result_count=42)
@@ -23,6 +23,48 @@ from logger import get_logger
 
 logger = get_logger()
 
+# Preview dialog messages (filled in with str.format)
+_DIM_TEMPLATE = """Preview: Dimension Operation
+
+**Operation:** Create continuous dimensions
+**Target:** {element_type} in {scope}
+**Estimated Dimensions:** {count} dimension chains
+
+This operation will:
+• Analyze room/element boundaries
+• Create dimension chains at 200mm offset
+• Use firm's default dimension style
+
+The operation is reversible with Ctrl+Z (Undo).
+
+Do you want to proceed?"""
+
+_TAG_TEMPLATE = """Preview: Tag Operation
+
+**Operation:** Create element tags
+**Target:** {element_type} in {scope}
+**Estimated Tags:** {count} tags
+
+This operation will:
+• Find all {element_type} elements
+• Position tags using intelligent placement
+• Apply firm's default tag family
+• Avoid overlapping tags
+
+The operation is reversible with Ctrl+Z (Undo).
+
+Do you want to proceed?"""
+
+_GENERIC_TEMPLATE = """Preview: {operation}
+
+{description}
+
+**Items to process:** {count}
+
+The operation is reversible with Ctrl+Z (Undo).
+
+Do you want to proceed?"""
+
 
 class PreviewManager:
     """
@@ -35,6 +77,8 @@ class PreviewManager:
     Current implementation uses simple dialog-based preview.
     """
 
+    __slots__ = ('uidoc', 'doc', 'preview_elements')
+
     def __init__(self, uidoc):
         """
         Initialize preview manager
@@ -66,20 +110,7 @@ class PreviewManager:
         scope = targets.get('scope', 'current view')
 
         # Build preview message
-        message = f"""Preview: Dimension Operation
-
-**Operation:** Create continuous dimensions
-**Target:** {element_type} in {scope}
-**Estimated Dimensions:** {dimension_count} dimension chains
-
-This operation will:
-• Analyze room/element boundaries
-• Create dimension chains at 200mm offset
-• Use firm's default dimension style
-
-The operation is reversible with Ctrl+Z (Undo).
-
-Do you want to proceed?"""
+        message = _DIM_TEMPLATE.format(element_type=element_type, scope=scope, count=dimension_count)
 
         return self._show_confirmation(
             title="Preview: Add Dimensions",
@@ -106,21 +137,7 @@ Do you want to proceed?"""
         scope = targets.get('scope', 'current view')
 
         # Build preview message
-        message = f"""Preview: Tag Operation
-
-**Operation:** Create element tags
-**Target:** {element_type} in {scope}
-**Estimated Tags:** {tag_count} tags
-
-This operation will:
-• Find all {element_type} elements
-• Position tags using intelligent placement
-• Apply firm's default tag family
-• Avoid overlapping tags
-
-The operation is reversible with Ctrl+Z (Undo).
-
-Do you want to proceed?"""
+        message = _TAG_TEMPLATE.format(element_type=element_type, scope=scope, count=tag_count)
 
         return self._show_confirmation(
             title="Preview: Add Tags",
@@ -144,15 +161,7 @@ Do you want to proceed?"""
         Returns:
             True if user confirms, False if user cancels
         """
-        message = f"""Preview: {operation}
-
-{description}
-
-**Items to process:** {item_count}
-
-The operation is reversible with Ctrl+Z (Undo).
-
-Do you want to proceed?"""
+        message = _GENERIC_TEMPLATE.format(operation=operation, description=description, count=item_count)
 
         return self._show_confirmation(
             title=f"Preview: {operation}",
@@ -173,7 +182,7 @@ Do you want to proceed?"""
         if not REVIT_API_AVAILABLE:
             print(f"[PREVIEW] {title}")
             print(message)
-            logger.info(f"Preview shown (development mode): {title}")
+            logger.info("Preview shown (development mode): %s", title)
             return True
 
         try:
@@ -182,17 +191,16 @@ Do you want to proceed?"""
             dialog.MainContent = message
             dialog.CommonButtons = TaskDialogCommonButtons.Yes | TaskDialogCommonButtons.No
             dialog.DefaultButton = TaskDialogCommonButtons.No  # Safety: default to No
-
             result = dialog.Show()
 
             confirmed = (result == TaskDialogResult.Yes)
 
-            logger.info(f"Preview confirmation: {title} - {'Confirmed' if confirmed else 'Cancelled'}")
+            logger.info("Preview confirmation: %s - %s", title, 'Confirmed' if confirmed else 'Cancelled')
 
             return confirmed
 
         except Exception as e:
-            logger.exception(f"Failed to show preview dialog: {e}")
+            logger.exception("Failed to show preview dialog: %s", e)
             raise PreviewError(f"Preview dialog failed: {e}") from e
 
     def clear_preview(self):
@@ -10,7 +10,10 @@ try:
     from Autodesk.Revit.DB import (
         FilteredElementCollector,
         BuiltInCategory,
+        ElementIsElementTypeFilter,
+        ElementLevelFilter,
         Level,
+        LogicalOrFilter,
         Room,
         View,
         Transaction,
@@ -23,6 +26,66 @@ except ImportError:
     print("Warning: Revit API not available (development mode)")
 
 from exceptions import RevitAPIError
+from config_manager import get_session_object, set_session_object
+
+# Session variable holding the per-document context cache, so it survives
+# pyRevit re-importing this module on every click
+_SESSION_CONTEXT_CACHE = '_revitai_context_cache'
+
+# Document-derived context keyed by document (see _get_context_cache)
+_context_cache = None
+
+
+def _document_key(doc) -> str:
+    """Key identifying an open document in the context cache"""
+    return f"{doc.PathName}|{doc.GetHashCode()}"
+
+
+def _get_context_cache(app) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Get the context cache, creating it on first use in the session
+
+    The cache is created together with a DocumentChanged subscription that
+    drops a document's entry whenever that document changes. Both are made
+    once per Revit session: later imports find the cache in the session
+    store and do not subscribe again.
+
+    Args:
+        app: Revit Application (source of DocumentChanged events)
+
+    Returns:
+        The cache, or None if it cannot be kept for the session (caching is
+        then skipped, since subscribing on every import would pile up handlers)
+    """
+    global _context_cache
+    if _context_cache is None:
+        cache = get_session_object(_SESSION_CONTEXT_CACHE)
+        if cache is None:
+            cache = {}
+            set_session_object(_SESSION_CONTEXT_CACHE, cache)
+            if get_session_object(_SESSION_CONTEXT_CACHE) is None:
+                return None
+
+            def on_document_changed(sender, args):
+                cache.pop(_document_key(args.GetDocument()), None)
+
+            app.DocumentChanged += on_document_changed
+        _context_cache = cache
+    return _context_cache
+
+
+def _level_collector(doc):
+    """Collector of the document's levels (not yet evaluated)"""
+    return FilteredElementCollector(doc).OfClass(Level)
+
+
+def _room_collector(doc, level: Optional[Level] = None):
+    """Collector of the document's rooms, optionally on one level (not yet evaluated)"""
+    collector = FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_Rooms)
+    if level:
+        # Filter by level inside Revit's collector
+        collector = collector.WherePasses(ElementLevelFilter(level.Id))
+    return collector
 
 
 def get_all_levels(doc) -> List:
@@ -39,9 +102,7 @@ def get_all_levels(doc) -> List:
         return []
 
     try:
-        collector = FilteredElementCollector(doc)
-        levels = collector.OfClass(Level).ToElements()
-        return list(levels)
+        return list(_level_collector(doc).ToElements())
     except Exception as e:
         raise RevitAPIError(f"Failed to get levels: {e}") from e
 
@@ -61,17 +122,77 @@ def get_all_rooms(doc, level: Optional[Level] = None) -> List:
         return []
 
     try:
-        collector = FilteredElementCollector(doc)
-        rooms = collector.OfCategory(BuiltInCategory.OST_Rooms).ToElements()
+        return list(_room_collector(doc, level).ToElements())
+    except Exception as e:
+        raise RevitAPIError(f"Failed to get rooms: {e}") from e
 
-        if level:
-            # Filter by level
-            level_id = level.Id
-            rooms = [r for r in rooms if r.LevelId == level_id]
 
-        return list(rooms)
+def count_levels(doc) -> int:
+    """
+    Count the levels in the document without fetching them
+
+    Args:
+        doc: Revit Document
+
+    Returns:
+        Number of Level elements
+    """
+    if not REVIT_API_AVAILABLE:
+        return 0
+
+    try:
+        return _level_collector(doc).GetElementCount()
     except Exception as e:
-        raise RevitAPIError(f"Failed to get rooms: {e}") from e
+        raise RevitAPIError(f"Failed to count levels: {e}") from e
+
+
+def count_rooms(doc, level: Optional[Level] = None) -> int:
+    """
+    Count the rooms in the document or on a specific level without fetching them
+
+    Args:
+        doc: Revit Document
+        level: Optional Level to filter by
+
+    Returns:
+        Number of Room elements
+    """
+    if not REVIT_API_AVAILABLE:
+        return 0
+
+    try:
+        return _room_collector(doc, level).GetElementCount()
+    except Exception as e:
+        raise RevitAPIError(f"Failed to count rooms: {e}") from e
+
+
+def count_elements_by_category(doc, categories: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Count the elements (not element types) of several categories
+
+    Each category is counted natively by Revit (GetElementCount), so no
+    element is handed to Python.
+
+    Args:
+        doc: Revit Document
+        categories: Mapping of count label to BuiltInCategory
+
+    Returns:
+        Dictionary of count label to element count
+    """
+    if not REVIT_API_AVAILABLE:
+        return dict.fromkeys(categories, 0)
+
+    try:
+        return {
+            label: FilteredElementCollector(doc)
+            .OfCategory(category)
+            .WhereElementIsNotElementType()
+            .GetElementCount()
+            for label, category in categories.items()
+        }
+    except Exception as e:
+        raise RevitAPIError(f"Failed to count elements: {e}") from e
 
 
 def get_current_view(uidoc) -> Optional[View]:
@@ -107,12 +228,15 @@ def get_selected_elements(uidoc) -> List:
         return []
 
     try:
-        doc = uidoc.Document
-        selection = uidoc.Selection
-        element_ids = selection.GetElementIds()
+        element_ids = uidoc.Selection.GetElementIds()
+        if element_ids.Count == 0:
+            return []
 
-        elements = [doc.GetElement(id) for id in element_ids]
-        return [e for e in elements if e is not None]
+        # Resolve all ids in one collector pass; collectors must have a
+        # filter before iterating, so pass both types and instances
+        any_element = LogicalOrFilter(ElementIsElementTypeFilter(False), ElementIsElementTypeFilter(True))
+        collector = FilteredElementCollector(uidoc.Document, element_ids).WherePasses(any_element)
+        return list(collector.ToElements())
 
     except Exception as e:
         raise RevitAPIError(f"Failed to get selected elements: {e}") from e
@@ -171,6 +295,10 @@ def build_revit_context(uidoc) -> Dict[str, Any]:
     """
     Build context dictionary with Revit project information
 
+    Levels, element counts and firm standards are cached per document until
+    the document changes; the current view and selection are always read
+    fresh.
+
     Args:
         uidoc: Revit UIDocument
 
@@ -192,38 +320,42 @@ def build_revit_context(uidoc) -> Dict[str, Any]:
         current_view = uidoc.ActiveView
         view_name = current_view.Name if current_view else "None"
 
-        # Levels
-        levels = get_all_levels(doc)
-        level_names = [level.Name for level in levels]
-
-        # Element counts
-        element_counts = {}
-
-        # Count rooms
-        rooms = get_all_rooms(doc)
-        element_counts['Room'] = len(rooms)
-
-        # Count walls
-        walls = FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_Walls).ToElements()
-        element_counts['Wall'] = len(list(walls))
-
-        # Count doors
-        doors = FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_Doors).ToElements()
-        element_counts['Door'] = len(list(doors))
+        # Document-derived context, rebuilt only after the document changes
+        cache = _get_context_cache(doc.Application)
+        doc_key = _document_key(doc)
+        doc_context = cache.get(doc_key) if cache is not None else None
+        if doc_context is None:
+            # Levels
+            level_names = [level.Name for level in get_all_levels(doc)]
+
+            # Element counts (rooms, walls and doors in one pass)
+            element_counts = count_elements_by_category(doc, {
+                'Room': BuiltInCategory.OST_Rooms,
+                'Wall': BuiltInCategory.OST_Walls,
+                'Door': BuiltInCategory.OST_Doors,
+            })
+
+            doc_context = {
+                'levels': level_names,
+                'element_counts': element_counts,
+                'firm_standards': {
+                    'dimension_offset': 200,
+                    'dimension_style': 'Continuous'
+                }
+            }
+            if cache is not None:
+                cache[doc_key] = doc_context
 
-        # Selected elements
-        selected = get_selected_elements(uidoc)
+        # Selected elements (only the count is needed)
+        selected_count = uidoc.Selection.GetElementIds().Count
 
-        # Build context
+        # Build context (copies, so callers cannot modify the cached entry)
         context = {
             'current_view': view_name,
-            'levels': level_names,
-            'element_counts': element_counts,
-            'selected_elements': len(selected),
-            'firm_standards': {
-                'dimension_offset': 200,
-                'dimension_style': 'Continuous'
-            }
+            'levels': list(doc_context['levels']),
+            'element_counts': dict(doc_context['element_counts']),
+            'selected_elements': selected_count,
+            'firm_standards': dict(doc_context['firm_standards'])
         }
 
         return context
@@ -3,21 +3,22 @@ Safety Validator
 Implements operation allowlist and validates all AI actions before execution
 """
 
-from typing import Dict, Any, List, Optional, Set
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, FrozenSet, Callable, Mapping
 
 from exceptions import ValidationError
 from config_manager import get_config_manager
 
 
 # Allowlist of permitted operations
-ALLOWED_OPERATIONS: Set[str] = {
+ALLOWED_OPERATIONS: FrozenSet[str] = frozenset({
     "create_dimensions",     # Create dimension chains
     "create_tags",          # Create element tags
     "read_elements",        # Query element properties (read-only)
-}
+})
 
 # Blocked operations (explicitly forbidden)
-BLOCKED_OPERATIONS: Set[str] = {
+BLOCKED_OPERATIONS: FrozenSet[str] = frozenset({
     "delete_elements",      # Delete model elements
     "modify_walls",         # Modify wall geometry
     "modify_doors",         # Modify door properties
@@ -26,7 +27,22 @@ BLOCKED_OPERATIONS: Set[str] = {
     "close_project",        # Close the project
     "export_data",          # Export project data
     "import_data",          # Import external data
-}
+})
+
+# Element types that can be tagged
+ALLOWED_TAG_TYPES: FrozenSet[str] = frozenset({
+    "Door", "Window", "Room", "Wall", "Floor", "Ceiling",
+})
+
+# Scopes accepted besides a level name like 'Level 1'
+_STATIC_SCOPES: FrozenSet[str] = frozenset({"current_view", "selected", "all"})
+
+# Shared read-only stand-in for a missing 'targets' field
+_EMPTY_TARGETS: Mapping[str, Any] = MappingProxyType({})
+
+# Error-message lists, built once
+_ALLOWED_OPS_MSG = ', '.join(sorted(ALLOWED_OPERATIONS))
+_ALLOWED_TAG_TYPES_MSG = ', '.join(sorted(ALLOWED_TAG_TYPES))
 
 # Maximum limits for safety
 DEFAULT_MAX_ELEMENTS = 500
@@ -44,6 +60,8 @@ class SafetyValidator:
     - No destructive actions are performed
     """
 
+    __slots__ = ('max_elements', 'max_dimensions', 'max_tags')
+
     def __init__(self):
         """Initialize the safety validator"""
         config = get_config_manager()
@@ -69,6 +87,39 @@ class SafetyValidator:
         Args:
             action: Action dictionary from Claude API
 
+        Raises:
+            ValidationError: If action is not allowed or exceeds limits
+        """
+        self._check_action(action)
+
+    def validate_actions(self, actions: List[Dict[str, Any]]) -> None:
+        """
+        Validate a batch of actions, stopping at the first invalid one
+
+        Applies the same checks as validate_action to every action.
+
+        Args:
+            actions: Action dictionaries from Claude API
+
+        Raises:
+            ValidationError: If any action is invalid; the message starts
+                with the index of the offending action
+        """
+        for index, action in enumerate(actions):
+            try:
+                self._check_action(action)
+            except ValidationError as e:
+                raise ValidationError(f"Action [{index}]: {e}") from e
+
+    def _check_action(self, action: Dict[str, Any]) -> None:
+        """
+        Check an action's structure, allowlist entry and operation rules
+
+        The single code path behind validate_action and validate_actions.
+
+        Args:
+            action: Action dictionary to check
+
         Raises:
             ValidationError: If action is not allowed or exceeds limits
         """
@@ -85,12 +136,9 @@ class SafetyValidator:
         self._validate_operation_allowed(operation)
 
         # Validate operation-specific rules
-        if operation == "create_dimensions":
-            self._validate_dimension_operation(action)
-        elif operation == "create_tags":
-            self._validate_tag_operation(action)
-        elif operation == "read_elements":
-            self._validate_read_operation(action)
+        handler = self._DISPATCH.get(operation)
+        if handler is not None:
+            handler(self, action, action.get('targets') or _EMPTY_TARGETS)
 
     def _validate_operation_allowed(self, operation: str) -> None:
         """
@@ -102,32 +150,33 @@ class SafetyValidator:
         Raises:
             ValidationError: If operation is not allowed
         """
-        # Check blocked operations first
+        # Fast path: allowed operations need a single lookup
+        if operation in ALLOWED_OPERATIONS:
+            return
+
+        # Blocked operations get a more specific message than unknown ones
         if operation in BLOCKED_OPERATIONS:
             raise ValidationError(
                 f"Operation '{operation}' is explicitly forbidden. "
                 f"This operation could damage the project file."
             )
 
-        # Check allowlist
-        if operation not in ALLOWED_OPERATIONS:
-            raise ValidationError(
-                f"Operation '{operation}' is not allowed. "
-                f"Permitted operations: {', '.join(sorted(ALLOWED_OPERATIONS))}"
-            )
+        raise ValidationError(
+            f"Operation '{operation}' is not allowed. "
+            f"Permitted operations: {_ALLOWED_OPS_MSG}"
+        )
 
-    def _validate_dimension_operation(self, action: Dict[str, Any]) -> None:
+    def _validate_dimension_operation(self, action: Dict[str, Any], targets: Mapping[str, Any]) -> None:
         """
         Validate dimension creation operation
 
         Args:
             action: Dimension action dictionary
+            targets: The action's targets
 
         Raises:
             ValidationError: If operation exceeds limits
         """
-        targets = action.get('targets', {})
-
         # Check element count if specified
         element_count = targets.get('element_count', 0)
         if element_count > self.max_elements:
@@ -148,24 +197,23 @@ class SafetyValidator:
 
         # Validate scope
         scope = targets.get('scope')
-        if scope and scope not in ['current_view', 'selected', 'all'] and not scope.startswith('Level '):
+        if scope and scope not in _STATIC_SCOPES and not scope.startswith('Level '):
             raise ValidationError(
                 f"Invalid scope: {scope}. "
                 f"Must be 'current_view', 'selected', 'all', or a level name like 'Level 1'."
             )
 
-    def _validate_tag_operation(self, action: Dict[str, Any]) -> None:
+    def _validate_tag_operation(self, action: Dict[str, Any], targets: Mapping[str, Any]) -> None:
         """
         Validate tag creation operation
 
         Args:
             action: Tag action dictionary
+            targets: The action's targets
 
         Raises:
             ValidationError: If operation exceeds limits
         """
-        targets = action.get('targets', {})
-
         # Check element count if specified
         element_count = targets.get('element_count', 0)
         if element_count > self.max_elements:
@@ -184,26 +232,23 @@ class SafetyValidator:
 
         # Validate element type
         element_type = targets.get('element_type')
-        if element_type:
-            allowed_types = ['Door', 'Window', 'Room', 'Wall', 'Floor', 'Ceiling']
-            if element_type not in allowed_types:
-                raise ValidationError(
-                    f"Cannot tag element type '{element_type}'. "
-                    f"Allowed types: {', '.join(allowed_types)}"
-                )
+        if element_type and element_type not in ALLOWED_TAG_TYPES:
+            raise ValidationError(
+                f"Cannot tag element type '{element_type}'. "
+                f"Allowed types: {_ALLOWED_TAG_TYPES_MSG}"
+            )
 
-    def _validate_read_operation(self, action: Dict[str, Any]) -> None:
+    def _validate_read_operation(self, action: Dict[str, Any], targets: Mapping[str, Any]) -> None:
         """
         Validate read-only operation
 
         Args:
             action: Read action dictionary
+            targets: The action's targets
 
         Raises:
             ValidationError: If operation exceeds limits
         """
-        targets = action.get('targets', {})
-
         # Check element count if specified
         element_count = targets.get('element_count', 0)
         if element_count > self.max_elements * 2:  # Allow more for read-only
@@ -212,6 +257,13 @@ class SafetyValidator:
                 f"(maximum: {self.max_elements * 2})"
             )
 
+    # Operation-specific validators (plain functions; called with self)
+    _DISPATCH: Dict[str, Callable[..., None]] = {
+        "create_dimensions": _validate_dimension_operation,
+        "create_tags": _validate_tag_operation,
+        "read_elements": _validate_read_operation,
+    }
+
     def check_scope_limits(
         self,
         operation: str,
@@ -32,6 +32,79 @@ from exceptions import APIError, ValidationError, ConfigurationError
 
 logger = get_logger()
 
+# Dialog texts (the system info template is filled in with str.format)
+_COPILOT_CONTENT = """Welcome to RevitAI Co-pilot!
+
+**Epic 1 Complete:** Foundation infrastructure ready
+- ✓ Claude API Integration
+- ✓ Safety validation (operation allowlist)
+- ✓ Preview/confirm pattern
+- ✓ Logging and diagnostics
+
+**Next:** Epic 2 - Intelligent Dimension Automation
+
+**For full natural language interface:**
+Run: `/bmad:bmm:workflows:dev-story` to implement Epic 2
+
+**Example Commands (coming in Epic 2):**
+• Hebrew: "תוסיף מידות פנימיות לכל החדרים בקומה 1"
+• English: "Add internal dimensions to all rooms on Level 1"
+
+**For now:** Test the foundation by clicking "Test Connection" below."""
+
+_SYSINFO_TEMPLATE = """**RevitAI System Information**
+
+**Revit Context:**
+• Current View: {view}
+• Levels: {levels}
+• Rooms: {rooms}
+• Walls: {walls}
+• Doors: {doors}
+• Selected: {selected} elements
+
+**Configuration:**
+• API Key: {api_key}
+• Model: {model}
+• Language: {language}
+• Max Elements: {max_elements}
+
+**Epic 1 Status:**
+✓ Project Setup Complete
+✓ Claude API Integration
+✓ ExternalEvent Pattern
+✓ Operation Allowlist
+✓ Preview/Confirm UX
+✓ Logging Infrastructure
+✓ Ribbon UI
+
+**Next Steps:**
+→ Implement Epic 2: Intelligent Dimension Automation
+→ Run: `/bmad:bmm:workflows:dev-story` to continue"""
+
+_API_KEY_REQUIRED_CONTENT = """RevitAI requires a Claude API key to function.
+
+**To configure your API key:**
+
+**Option 1: Environment Variable**
+Set environment variable: CLAUDE_API_KEY=sk-...
+
+**Option 2: Windows Credential Manager (Recommended)**
+Install keyring: pip install keyring
+Run from Python:
+```python
+from lib.config_manager import get_config_manager
+config = get_config_manager()
+config.set_api_key("sk-...")
+```
+
+**Option 3: Configuration File**
+Create: .extensions/RevitAI.extension/config/firm_defaults.yaml
+(Copy from firm_defaults.example.yaml)
+
+**Get an API Key:**
+Visit: https://console.anthropic.com/
+Create an account and generate an API key."""
+
 
 def show_copilot_dialog(uidoc):
     """
@@ -57,24 +130,7 @@ def show_copilot_dialog(uidoc):
         # Show main dialog
         dialog = TaskDialog("RevitAI Co-pilot")
         dialog.MainInstruction = "AI Co-pilot for Revit"
-        dialog.MainContent = """Welcome to RevitAI Co-pilot!
-
-**Epic 1 Complete:** Foundation infrastructure ready
-- ✓ Claude API Integration
-- ✓ Safety validation (operation allowlist)
-- ✓ Preview/confirm pattern
-- ✓ Logging and diagnostics
-
-**Next:** Epic 2 - Intelligent Dimension Automation
-
-**For full natural language interface:**
-Run: `/bmad:bmm:workflows:dev-story` to implement Epic 2
-
-**Example Commands (coming in Epic 2):**
-• Hebrew: "תוסיף מידות פנימיות לכל החדרים בקומה 1"
-• English: "Add internal dimensions to all rooms on Level 1"
-
-**For now:** Test the foundation by clicking "Test Connection" below."""
+        dialog.MainContent = _COPILOT_CONTENT
 
         dialog.AddCommandLink(TaskDialogCommonButtons.CommandLink1, "Test Claude API Connection")
         dialog.AddCommandLink(TaskDialogCommonButtons.CommandLink2, "View System Information")
@@ -88,7 +144,7 @@ Run: `/bmad:bmm:workflows:dev-story` to implement Epic 2
             show_system_info(uidoc)
 
     except Exception as e:
-        logger.error(f"Failed to show co-pilot dialog: {e}", exc_info=True)
+        logger.error("Failed to show co-pilot dialog: %s", e, exc_info=True)
         show_error_dialog("Error", f"Failed to show dialog: {e}")
 
 
@@ -155,39 +211,24 @@ def show_system_info(uidoc):
         has_api_key = config.validate_api_key()
 
         # Build info message
-        info = f"""**RevitAI System Information**
-
-**Revit Context:**
-• Current View: {context.get('current_view', 'None')}
-• Levels: {', '.join(context.get('levels', []))}
-• Rooms: {context.get('element_counts', {}).get('Room', 0)}
-• Walls: {context.get('element_counts', {}).get('Wall', 0)}
-• Doors: {context.get('element_counts', {}).get('Door', 0)}
-• Selected: {context.get('selected_elements', 0)} elements
-
-**Configuration:**
-• API Key: {'✓ Configured' if has_api_key else '✗ Not configured'}
-• Model: {config.get('api_settings.model', 'claude-sonnet-4')}
-• Language: {config.get('language', 'en')}
-• Max Elements: {config.get('safety.max_elements_per_operation', 500)}
-
-**Epic 1 Status:**
-✓ Project Setup Complete
-✓ Claude API Integration
-✓ ExternalEvent Pattern
-✓ Operation Allowlist
-✓ Preview/Confirm UX
-✓ Logging Infrastructure
-✓ Ribbon UI
-
-**Next Steps:**
-→ Implement Epic 2: Intelligent Dimension Automation
-→ Run: `/bmad:bmm:workflows:dev-story` to continue"""
+        element_counts = context.get('element_counts', {})
+        info = _SYSINFO_TEMPLATE.format(
+            view=context.get('current_view', 'None'),
+            levels=', '.join(context.get('levels', [])),
+            rooms=element_counts.get('Room', 0),
+            walls=element_counts.get('Wall', 0),
+            doors=element_counts.get('Door', 0),
+            selected=context.get('selected_elements', 0),
+            api_key='✓ Configured' if has_api_key else '✗ Not configured',
+            model=config.get('api_settings.model', 'claude-sonnet-4'),
+            language=config.get('language', 'en'),
+            max_elements=config.get('safety.max_elements_per_operation', 500)
+        )
 
         show_message_dialog("System Information", info)
 
     except Exception as e:
-        logger.error(f"Failed to show system info: {e}", exc_info=True)
+        logger.error("Failed to show system info: %s", e, exc_info=True)
         show_error_dialog("Error", f"Failed to get system info: {e}")
 
 
@@ -199,29 +240,7 @@ def show_api_key_required_dialog():
 
     dialog = TaskDialog("API Key Required")
     dialog.MainInstruction = "Claude API Key Not Configured"
-    dialog.MainContent = """RevitAI requires a Claude API key to function.
-
-**To configure your API key:**
-
-**Option 1: Environment Variable**
-Set environment variable: CLAUDE_API_KEY=sk-...
-
-**Option 2: Windows Credential Manager (Recommended)**
-Install keyring: pip install keyring
-Run from Python:
-```python
-from lib.config_manager import get_config_manager
-config = get_config_manager()
-config.set_api_key("sk-...")
-```
-
-**Option 3: Configuration File**
-Create: .extensions/RevitAI.extension/config/firm_defaults.yaml
-(Copy from firm_defaults.example.yaml)
-
-**Get an API Key:**
-Visit: https://console.anthropic.com/
-Create an account and generate an API key."""
+    dialog.MainContent = _API_KEY_REQUIRED_CONTENT
 
     dialog.CommonButtons = TaskDialogCommonButtons.Ok
     dialog.Show()
@@ -0,0 +1,48 @@
+"""
+Shared pytest configuration for RevitAI tests
+
+Puts the extension lib and the test fixtures on sys.path once, before any
+test module is collected (also on each pytest-xdist worker).
+"""
+
+import os
+import sys
+
+import pytest
+
+tests_dir = os.path.dirname(__file__)
+lib_path = os.path.join(tests_dir, '..', '.extensions', 'RevitAI.extension', 'lib')
+fixtures_path = os.path.join(tests_dir, 'fixtures')
+
+for path in (lib_path, fixtures_path):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture
+def patched_anthropic(monkeypatch):
+    """
+    Replace claude_client.Anthropic with the shared mock client
+
+    Plain attribute rebinding (no MagicMock); the client cache is swapped
+    for an empty one so no test sees a client cached by another.
+    """
+    import claude_client
+    from mock_claude_api import SHARED_MOCK_CLIENT
+
+    monkeypatch.setattr(claude_client, 'Anthropic', lambda *args, **kwargs: SHARED_MOCK_CLIENT)
+    monkeypatch.setattr(claude_client, '_client_cache', {})
+
+
+@pytest.fixture(scope="module")
+def validator():
+    """
+    SafetyValidator shared by the tests of a module
+
+    The validator only reads its limits; a test that needs to change them
+    should build its own instance.
+    """
+    from safety_validator import SafetyValidator
+
+    return SafetyValidator()
+
@@ -11,8 +11,17 @@ from typing import Dict, Any
 
 class MockMessage:
     """Mock Anthropic Message response"""
-    def __init__(self, content: str):
+    def __init__(self, content: str, output_tokens: int = None):
         self.content = [MockTextBlock(content)]
+        # Rough estimate: ~4 characters per token
+        self.usage = MockUsage(output_tokens if output_tokens is not None else len(content) // 4)
+
+
+class MockUsage:
+    """Mock token usage"""
+    def __init__(self, output_tokens: int, input_tokens: int = 0):
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
 
 
 class MockTextBlock:
@@ -22,12 +31,102 @@ class MockTextBlock:
         self.type = "text"
 
 
+class MockMessageStream:
+    """Mock streaming response context manager"""
+    def __init__(self, message: MockMessage, chunk_size: int = 16):
+        self._message = message
+        self._chunk_size = chunk_size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    @property
+    def text_stream(self):
+        """Yield the response text in fixed-size chunks"""
+        text = self._message.content[0].text
+        for i in range(0, len(text), self._chunk_size):
+            yield text[i:i + self._chunk_size]
+
+    def get_final_message(self) -> MockMessage:
+        """Return the complete message"""
+        return self._message
+
+
 class MockAnthropicClient:
     """Mock Anthropic client for testing"""
 
     def __init__(self, api_key: str = "test_key"):
         self.api_key = api_key
         self.messages = MockMessages()
+        self.models = MockModels()
+
+
+class MockModels:
+    """Mock models API"""
+
+    def list(self, limit: int = 20, **kwargs):
+        """Mock model listing - returns a single model page"""
+        return [{"id": "claude-sonnet-4-20250514", "type": "model"}][:limit]
+
+
+def _fenced_message(response: Dict[str, Any]) -> MockMessage:
+    """Build a mock message holding the response as a ```json block"""
+    return MockMessage(f"```json\n{json.dumps(response, indent=2)}\n```")
+
+
+# Canned responses, built once at import (messages are never mutated)
+_DIM_MSG = _fenced_message({
+    "operation": "create_dimensions",
+    "target": {
+        "element_type": "rooms",
+        "filters": {"level": "Level 1"}
+    },
+    "params": {
+        "dimension_type": "interior",
+        "offset_mm": 200
+    }
+})
+
+_TAG_MSG = _fenced_message({
+    "operation": "create_tags",
+    "target": {
+        "element_type": "doors",
+        "filters": {}
+    },
+    "params": {
+        "tag_type": "door_tag"
+    }
+})
+
+_READ_MSG = _fenced_message({
+    "operation": "read_elements",
+    "target": {
+        "element_type": "rooms",
+        "filters": {}
+    },
+    "params": {
+        "properties": ["Number", "Name", "Area"]
+    }
+})
+
+_DEFAULT_MSG = _fenced_message({
+    "operation": "read_elements",
+    "target": {
+        "element_type": "all",
+        "filters": {}
+    },
+    "params": {}
+})
+
+# Prompt keywords (English, Hebrew) checked in order
+_KEYWORD_RESPONSES = (
+    (("dimension", "מידות"), _DIM_MSG),
+    (("tag", "תיוג"), _TAG_MSG),
+    (("read", "קרא"), _READ_MSG),
+)
 
 
 class MockMessages:
@@ -37,61 +136,23 @@ class MockMessages:
         """Mock message creation - returns predefined responses based on prompt"""
 
         # Extract user prompt
-        user_prompt = ""
-        for msg in messages:
-            if msg.get("role") == "user":
-                user_prompt = msg.get("content", "").lower()
-                break
-
-        # Return mocked responses based on prompt content
-        if "dimension" in user_prompt or "מידות" in user_prompt:
-            response = {
-                "operation": "create_dimensions",
-                "target": {
-                    "element_type": "rooms",
-                    "filters": {"level": "Level 1"}
-                },
-                "params": {
-                    "dimension_type": "interior",
-                    "offset_mm": 200
-                }
-            }
-        elif "tag" in user_prompt or "תיוג" in user_prompt:
-            response = {
-                "operation": "create_tags",
-                "target": {
-                    "element_type": "doors",
-                    "filters": {}
-                },
-                "params": {
-                    "tag_type": "door_tag"
-                }
-            }
-        elif "read" in user_prompt or "קרא" in user_prompt:
-            response = {
-                "operation": "read_elements",
-                "target": {
-                    "element_type": "rooms",
-                    "filters": {}
-                },
-                "params": {
-                    "properties": ["Number", "Name", "Area"]
-                }
-            }
-        else:
-            # Default response
-            response = {
-                "operation": "read_elements",
-                "target": {
-                    "element_type": "all",
-                    "filters": {}
-                },
-                "params": {}
-            }
+        user_prompt = next(
+            (msg.get("content", "") for msg in messages if msg.get("role") == "user"), ""
+        ).lower()
+
+        # Return the prebuilt response matching the prompt content
+        for keywords, message in _KEYWORD_RESPONSES:
+            if any(keyword in user_prompt for keyword in keywords):
+                return message
+        return _DEFAULT_MSG
+
+    def stream(self, model: str, max_tokens: int, system: str, messages: list, **kwargs):
+        """Mock streaming message creation - streams the create() response"""
+        return MockMessageStream(self.create(model, max_tokens, system, messages, **kwargs))
+
 
-        # Return as mock message
-        json_response = json.dumps(response, indent=2)
-        return MockMessage(f"```json\n{json_response}\n```")
+# Stateless mock client shared by tests that do not need their own
+SHARED_MOCK_CLIENT = MockAnthropicClient("test_key")
 
 
 class MockAnthropicError(Exception):
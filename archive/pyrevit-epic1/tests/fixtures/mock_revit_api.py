@@ -5,16 +5,24 @@ Provides mocked Revit API classes and objects for unit testing
 without requiring Revit to be running.
 """
 
+import itertools
 from typing import List, Optional, Any
 
+# Source of mock element id values (deterministic across runs)
+_NEXT_ID = itertools.count(1)
+
 
 class MockElementId:
     """Mock Revit ElementId"""
+    __slots__ = ('IntegerValue',)
+
     def __init__(self, value: int):
         self.IntegerValue = value
 
     def __eq__(self, other):
-        return self.IntegerValue == other.IntegerValue
+        return self is other or (
+            type(other) is MockElementId and self.IntegerValue == other.IntegerValue
+        )
 
     def __hash__(self):
         return hash(self.IntegerValue)
@@ -25,7 +33,7 @@ class MockLevel:
     def __init__(self, name: str, elevation: float = 0.0):
         self.Name = name
         self.Elevation = elevation
-        self.Id = MockElementId(hash(name))
+        self.Id = MockElementId(next(_NEXT_ID))
 
 
 class MockRoom:
@@ -35,32 +43,29 @@ class MockRoom:
         self.Name = name
         self.Level = level
         self.LevelId = level.Id
-        self.Id = MockElementId(hash(f"{number}_{name}"))
+        self.Id = MockElementId(next(_NEXT_ID))
 
 
 class MockView:
     """Mock Revit View"""
     def __init__(self, name: str):
         self.Name = name
-        self.Id = MockElementId(hash(name))
+        self.Id = MockElementId(next(_NEXT_ID))
 
 
 class MockDocument:
     """Mock Revit Document"""
     def __init__(self, title: str = "Test Project"):
         self.Title = title
-        self._elements = []
+        self._elements = {}
 
     def GetElement(self, element_id: MockElementId):
         """Get element by ID"""
-        for elem in self._elements:
-            if elem.Id == element_id:
-                return elem
-        return None
+        return self._elements.get(element_id.IntegerValue)
 
     def add_element(self, element):
         """Helper method to add elements for testing"""
-        self._elements.append(element)
+        self._elements[element.Id.IntegerValue] = element
 
 
 class MockSelection:
@@ -5,57 +5,97 @@ Tests Claude API integration with mocked API responses.
 """
 
 import pytest
-import sys
 import os
-from unittest.mock import Mock, patch, MagicMock
-
-# Add lib and fixtures to path
-lib_path = os.path.join(os.path.dirname(__file__), '..', '..', '.extensions', 'RevitAI.extension', 'lib')
-fixtures_path = os.path.join(os.path.dirname(__file__), '..', 'fixtures')
-sys.path.insert(0, lib_path)
-sys.path.insert(0, fixtures_path)
+import anthropic
+import httpx
+from unittest.mock import patch
 
+import claude_client
 from claude_client import ClaudeClient
 from exceptions import APIError, ConfigurationError
-from mock_claude_api import MockAnthropicClient, get_sample_responses
+from mock_claude_api import MockAnthropicClient, MockMessageStream, SHARED_MOCK_CLIENT
+
+API_KEY = "test_api_key_12345"
+
+
+class _RaisingModels:
+    """Models API stub whose every call fails"""
+    def list(self, **kwargs):
+        raise Exception("API Error")
+
+
+class _RaisingMessages:
+    """Messages API stub whose every call fails"""
+    def create(self, **kwargs):
+        raise Exception("API Error")
+
+    def stream(self, **kwargs):
+        raise Exception("API Error")
+
+
+class _RaisingClient:
+    """Anthropic client stub for connection-failure tests"""
+    messages = _RaisingMessages()
+    models = _RaisingModels()
+
+
+class _DroppingStream(MockMessageStream):
+    """Stream that delivers some chunks, then loses the connection"""
+    def __init__(self, chunks_before_drop):
+        self._chunks_before_drop = chunks_before_drop
+
+    @property
+    def text_stream(self):
+        yield from ['{"operation": ', '"create_dimensions"}'][:self._chunks_before_drop]
+        raise anthropic.APIConnectionError(
+            request=httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+        )
+
+
+@pytest.fixture(scope="module")
+def client():
+    """
+    ClaudeClient shared by the tests of this module that only read from it
+
+    Tests that check construction itself build their own client. The
+    Anthropic patch stays in place until the last test of the module.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(claude_client, 'Anthropic', lambda *args, **kwargs: SHARED_MOCK_CLIENT)
+        mp.setattr(claude_client, '_client_cache', {})
+        yield ClaudeClient(api_key=API_KEY)
 
 
 class TestClaudeClient:
     """Test suite for ClaudeClient"""
 
-    def setup_method(self):
-        """Set up test fixtures before each test"""
-        self.api_key = "test_api_key_12345"
+    @pytest.fixture(autouse=True)
+    def _mock_anthropic(self, patched_anthropic):
+        """Install MockAnthropicClient for every test"""
 
-    @patch('claude_client.Anthropic')
-    def test_client_initialization_with_api_key(self, mock_anthropic):
+    def test_client_initialization_with_api_key(self):
         """Test ClaudeClient initialization with API key"""
-        mock_anthropic.return_value = MockAnthropicClient(self.api_key)
+        client = ClaudeClient(api_key=API_KEY)
 
-        client = ClaudeClient(api_key=self.api_key)
-
-        assert client.api_key == self.api_key
-        assert client.model == "claude-sonnet-4-20250514"
-        mock_anthropic.assert_called_once()
+        # Configured model, or the built-in default when none is configured
+        assert client.model == client.config.get("api_settings.model", "claude-sonnet-4-20250514")
+        assert isinstance(client.client, MockAnthropicClient)
+        # The Anthropic client was built for (and cached under) this key
+        assert claude_client._client_cache[(API_KEY, client.timeout)] is client.client
 
     def test_client_initialization_without_api_key_raises_error(self):
         """Test that initialization without API key raises ConfigurationError"""
         # This test assumes no CLAUDE_API_KEY environment variable is set
         with patch.dict(os.environ, {}, clear=True):
-            with patch('claude_client.get_config_manager') as mock_config:
+            with patch.object(claude_client, 'get_config_manager') as mock_config:
                 mock_config.return_value.get_api_key.return_value = None
 
-                with pytest.raises(ConfigurationError, match="Claude API key not configured"):
+                with pytest.raises(ConfigurationError) as exc_info:
                     ClaudeClient()
+                assert "Claude API key not configured" in str(exc_info.value)
 
-    @patch('claude_client.Anthropic')
-    def test_parse_prompt_returns_structured_action(self, mock_anthropic):
+    def test_parse_prompt_returns_structured_action(self, client):
         """Test that parse_prompt returns structured JSON action"""
-        mock_client = MockAnthropicClient(self.api_key)
-        mock_anthropic.return_value = mock_client
-
-        client = ClaudeClient(api_key=self.api_key)
-
         # Test with dimension prompt
         result = client.parse_prompt("Add dimensions to all rooms", {})
 
@@ -63,14 +103,8 @@ class TestClaudeClient:
         assert "operation" in result
         assert result["operation"] == "create_dimensions"
 
-    @patch('claude_client.Anthropic')
-    def test_parse_prompt_with_hebrew(self, mock_anthropic):
+    def test_parse_prompt_with_hebrew(self, client):
         """Test parsing Hebrew language prompts"""
-        mock_client = MockAnthropicClient(self.api_key)
-        mock_anthropic.return_value = mock_client
-
-        client = ClaudeClient(api_key=self.api_key)
-
         # Test with Hebrew dimension prompt
         result = client.parse_prompt("תוסיף מידות לכל החדרים", {})
 
@@ -78,14 +112,70 @@ class TestClaudeClient:
         assert "operation" in result
         assert result["operation"] == "create_dimensions"
 
-    @patch('claude_client.Anthropic')
-    def test_parse_prompt_with_context(self, mock_anthropic):
+    def test_parse_prompt_reports_streaming_progress(self, client):
+        """Test that progress_cb receives each streamed chunk"""
+        chunks = []
+        result = client.parse_prompt("Add dimensions to all rooms", {}, progress_cb=chunks.append)
+
+        assert len(chunks) > 1
+        assert result == client._parse_json_response("".join(chunks))
+
+    @pytest.mark.parametrize("chunks_before_drop, expected_attempts", [
+        (0, 2),
+        (1, 1),
+    ], ids=["before_first_chunk", "mid_stream"])
+    def test_stream_failure_is_retried_only_before_progress(
+        self, client, monkeypatch, chunks_before_drop, expected_attempts
+    ):
+        """Test that a stream dropped after progress_cb got text is not replayed"""
+        attempts = []
+
+        def stream(**kwargs):
+            attempts.append(kwargs)
+            return _DroppingStream(chunks_before_drop)
+
+        monkeypatch.setattr(client, '_stream', stream)
+        monkeypatch.setattr(client, 'max_retries', 1)
+        monkeypatch.setattr(claude_client.time, 'sleep', lambda seconds: None)
+
+        chunks = []
+        with pytest.raises(APIError):
+            client.parse_prompt("Add dimensions to all rooms", {}, progress_cb=chunks.append)
+
+        assert len(attempts) == expected_attempts
+        assert len(chunks) == chunks_before_drop
+
+    @pytest.mark.parametrize("retry_after, expected_sleeps", [
+        ("3", [3.0]),
+        ("60", []),
+    ], ids=["honored", "over_elapsed_cap"])
+    def test_rate_limit_honors_retry_after(
+        self, client, monkeypatch, retry_after, expected_sleeps
+    ):
+        """Test that a 429 waits for retry-after unless that overruns the total cap"""
+        request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+        response = httpx.Response(429, headers={"retry-after": retry_after}, request=request)
+        calls = []
+
+        def func():
+            calls.append(None)
+            if len(calls) == 1:
+                raise anthropic.RateLimitError("rate limited", response=response, body=None)
+            return "ok"
+
+        sleeps = []
+        monkeypatch.setattr(client, 'max_retries', 1)
+        monkeypatch.setattr(claude_client.time, 'sleep', sleeps.append)
+
+        if expected_sleeps:
+            assert client._call_with_retry(func) == "ok"
+        else:
+            with pytest.raises(anthropic.RateLimitError):
+                client._call_with_retry(func)
+        assert sleeps == expected_sleeps
+
+    def test_parse_prompt_with_context(self, client):
         """Test that context is included in API call"""
-        mock_client = MockAnthropicClient(self.api_key)
-        mock_anthropic.return_value = mock_client
-
-        client = ClaudeClient(api_key=self.api_key)
-
         context = {
             "levels": ["Level 1", "Level 2"],
             "rooms": {"count": 5}
@@ -96,95 +186,59 @@ class TestClaudeClient:
         assert isinstance(result, dict)
         assert "operation" in result
 
-    @patch('claude_client.Anthropic')
-    def test_parse_json_response_with_code_fence(self, mock_anthropic):
-        """Test parsing JSON responses with markdown code fences"""
-        mock_anthropic.return_value = MockAnthropicClient(self.api_key)
-        client = ClaudeClient(api_key=self.api_key)
-
-        # Test with code fence
-        response_text = '''```json
+    @pytest.mark.parametrize("response_text, expected_operation", [
+        ('''```json
         {
             "operation": "create_tags",
             "target": {"element_type": "doors"},
             "params": {}
         }
-        ```'''
-
-        result = client._parse_json_response(response_text, response_text)
-
-        assert result["operation"] == "create_tags"
-
-    @patch('claude_client.Anthropic')
-    def test_parse_json_response_without_code_fence(self, mock_anthropic):
-        """Test parsing plain JSON responses"""
-        mock_anthropic.return_value = MockAnthropicClient(self.api_key)
-        client = ClaudeClient(api_key=self.api_key)
-
-        response_text = '{"operation": "read_elements", "target": {}, "params": {}}'
-
-        result = client._parse_json_response(response_text, response_text)
-
-        assert result["operation"] == "read_elements"
-
-    @patch('claude_client.Anthropic')
-    def test_parse_invalid_json_raises_api_error(self, mock_anthropic):
-        """Test that invalid JSON raises APIError"""
-        mock_anthropic.return_value = MockAnthropicClient(self.api_key)
-        client = ClaudeClient(api_key=self.api_key)
-
-        invalid_json = "This is not JSON"
-
-        with pytest.raises(APIError, match="Failed to parse JSON response"):
-            client._parse_json_response(invalid_json, invalid_json)
-
-    @patch('claude_client.Anthropic')
-    def test_test_connection_success(self, mock_anthropic):
+        ```''', "create_tags"),
+        ('{"operation": "read_elements", "target": {}, "params": {}}', "read_elements"),
+        ("This is not JSON", None),
+    ], ids=["code_fence", "plain_json", "invalid_json"])
+    def test_parse_json_response(self, client, response_text, expected_operation):
+        """Test parsing JSON responses with and without markdown code fences"""
+        if expected_operation is None:
+            # Invalid JSON raises APIError
+            with pytest.raises(APIError) as exc_info:
+                client._parse_json_response(response_text)
+            assert "Failed to parse JSON response" in str(exc_info.value)
+        else:
+            result = client._parse_json_response(response_text)
+
+            assert result["operation"] == expected_operation
+
+    def test_test_connection_success(self, client):
         """Test that test_connection returns True on success"""
-        mock_client = MockAnthropicClient(self.api_key)
-        mock_anthropic.return_value = mock_client
-
-        client = ClaudeClient(api_key=self.api_key)
-
         result = client.test_connection()
 
         assert result is True
 
-    @patch('claude_client.Anthropic')
-    def test_test_connection_handles_api_error(self, mock_anthropic):
+    def test_test_connection_handles_api_error(self, monkeypatch):
         """Test that test_connection handles API errors gracefully"""
-        # Create a mock that raises an error
-        mock_client = Mock()
-        mock_client.messages.create.side_effect = Exception("API Error")
-        mock_anthropic.return_value = mock_client
+        # Use a client whose API calls raise an error
+        monkeypatch.setattr(claude_client, 'Anthropic', lambda *args, **kwargs: _RaisingClient())
 
-        client = ClaudeClient(api_key=self.api_key)
+        client = ClaudeClient(api_key=API_KEY)
 
         result = client.test_connection()
 
         # Should return False on error, not raise exception
         assert result is False
 
-    @patch('claude_client.Anthropic')
-    def test_client_uses_configured_model(self, mock_anthropic):
+    def test_client_uses_configured_model(self):
         """Test that client uses model from configuration"""
-        mock_anthropic.return_value = MockAnthropicClient(self.api_key)
-
-        with patch('claude_client.get_config_manager') as mock_config:
+        with patch.object(claude_client, 'get_config_manager') as mock_config:
             mock_config.return_value.get.return_value = "claude-opus-4"
 
-            client = ClaudeClient(api_key=self.api_key)
+            client = ClaudeClient(api_key=API_KEY)
 
             # Should use configured model
             assert "claude" in client.model.lower()
 
-    @patch('claude_client.Anthropic')
-    def test_system_prompt_includes_allowed_operations(self, mock_anthropic):
+    def test_system_prompt_includes_allowed_operations(self, client):
         """Test that system prompt includes allowed operations"""
-        mock_anthropic.return_value = MockAnthropicClient(self.api_key)
-
-        client = ClaudeClient(api_key=self.api_key)
-
         system_prompt = client._get_system_prompt()
 
         # Should mention supported operations
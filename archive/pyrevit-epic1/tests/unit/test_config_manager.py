@@ -5,108 +5,175 @@ Tests configuration loading, API key management, and nested key access.
 """
 
 import pytest
+import io
+import json
 import sys
 import os
-import tempfile
 import yaml
+from unittest.mock import Mock, patch
 
-# Add lib to path
-lib_path = os.path.join(os.path.dirname(__file__), '..', '..', '.extensions', 'RevitAI.extension', 'lib')
-sys.path.insert(0, lib_path)
-
-from config_manager import ConfigManager, get_config_manager
+from config_manager import (
+    ConfigManager, get_config_manager, reset_config_manager,
+    get_session_object, set_session_object
+)
 from exceptions import ConfigurationError
 
+# libyaml-backed dumper when available (same preference as ConfigManager's loader)
+_Dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+
+def _dump_yaml(config, stream=None):
+    """Emit config as flow-style YAML in insertion order (ConfigManager only parses it back)"""
+    return yaml.dump(config, stream, Dumper=_Dumper, default_flow_style=True, sort_keys=False)
+
+
+# Sample configuration
+_SAMPLE_CONFIG = {
+    "language": "en",
+    "api_settings": {
+        "model": "claude-sonnet-4",
+        "timeout_seconds": 10,
+        "max_retries": 3
+    },
+    "safety": {
+        "max_elements_per_operation": 500
+    },
+    "logging": {
+        "log_level": "INFO"
+    }
+}
+
+# Sample configurations as YAML bytes, emitted once at import
+_SAMPLE_YAML_BYTES = _dump_yaml(_SAMPLE_CONFIG).encode('utf-8')
+_SAMPLE_CONFIG_WITH_LIST_YAML_BYTES = _dump_yaml(
+    {**_SAMPLE_CONFIG, "allowed_operations": ["create_dimensions", "create_tags"]}
+).encode('utf-8')
+
+
+def _fake_pyrevit(envvars):
+    """sys.modules entries for a pyrevit.script whose session variables live in envvars"""
+    script = Mock()
+    script.get_envvar.side_effect = envvars.get
+    script.set_envvar.side_effect = envvars.__setitem__
+    return {"pyrevit": Mock(script=script), "pyrevit.script": script}
+
+
+@pytest.fixture(scope="session")
+def config_manager(tmp_path_factory):
+    """
+    ConfigManager for the sample config, parsed once and shared by read-only tests
+
+    Tests that modify the manager or its file build their own instance.
+    """
+    config_file = tmp_path_factory.mktemp("cfg") / "test_config.yaml"
+    config_file.write_bytes(_SAMPLE_YAML_BYTES)
+    manager = ConfigManager(str(config_file))
+    manager.load_config()
+    return manager
+
 
 class TestConfigManager:
     """Test suite for ConfigManager"""
 
-    def setup_method(self):
-        """Set up test fixtures before each test"""
-        # Create a temporary config file
-        self.temp_dir = tempfile.mkdtemp()
-        self.config_file = os.path.join(self.temp_dir, "test_config.yaml")
-
-        # Sample configuration
-        self.sample_config = {
-            "language": "en",
-            "api_settings": {
-                "model": "claude-sonnet-4",
-                "timeout_seconds": 10,
-                "max_retries": 3
-            },
-            "safety": {
-                "max_elements_per_operation": 500
-            },
-            "logging": {
-                "log_level": "INFO"
-            }
-        }
-
-        # Write sample config
-        with open(self.config_file, 'w') as f:
-            yaml.dump(self.sample_config, f)
+    @pytest.fixture(scope="class", autouse=True)
+    def _sample_config_file(self, request, tmp_path_factory):
+        """Write the sample config file once for the whole class"""
+        # pytest removes the directory (including the JSON sidecar) itself
+        temp_dir = tmp_path_factory.mktemp("config")
+        config_file = temp_dir / "test_config.yaml"
+        config_file.write_bytes(_SAMPLE_YAML_BYTES)
+
+        request.cls.temp_dir = str(temp_dir)
+        request.cls.config_file = str(config_file)
+        request.cls.sample_config = _SAMPLE_CONFIG
 
     def teardown_method(self):
         """Clean up after each test"""
-        # Remove temp files
-        if os.path.exists(self.config_file):
-            os.remove(self.config_file)
-        if os.path.exists(self.temp_dir):
-            os.rmdir(self.temp_dir)
+        ConfigManager.clear_cache()
+
+    def _write_config(self, name, config):
+        """Write a config file of a test's own (the shared file is read-only)"""
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'w') as f:
+            _dump_yaml(config, f)
+        return path
 
     def test_load_valid_config(self):
         """Test loading a valid YAML configuration"""
-        config = ConfigManager(self.config_file)
+        config = ConfigManager(_SAMPLE_YAML_BYTES)
+        config.load_config()
         assert config._config is not None
         assert config._config["language"] == "en"
 
-    def test_get_top_level_key(self):
-        """Test getting top-level configuration values"""
-        config = ConfigManager(self.config_file)
-        assert config.get("language") == "en"
-
-    def test_get_nested_key_with_dot_notation(self):
-        """Test getting nested values using dot notation"""
-        config = ConfigManager(self.config_file)
-        assert config.get("api_settings.model") == "claude-sonnet-4"
+    @pytest.mark.parametrize("key, default_args, expected", [
+        # Top-level key
+        ("language", (), "en"),
+        # Nested keys with dot notation
+        ("api_settings.model", (), "claude-sonnet-4"),
+        ("api_settings.timeout_seconds", (), 10),
+        ("safety.max_elements_per_operation", (), 500),
+        # Missing keys return the default (None without one)
+        ("nonexistent_key", ("default",), "default"),
+        ("api_settings.nonexistent", (100,), 100),
+        ("nonexistent_key", (), None),
+    ])
+    def test_get(self, config_manager, key, default_args, expected):
+        """Test getting top-level, nested and missing configuration values"""
+        assert config_manager.get(key, *default_args) == expected
+
+    def test_load_config_from_disk(self):
+        """Test a file load: read via fstat, then served from the sidecar and parse cache"""
+        config_file = self._write_config("on_disk.yaml", self.sample_config)
+        config = ConfigManager(config_file)
+        assert config.load_config() == self.sample_config
         assert config.get("api_settings.timeout_seconds") == 10
-        assert config.get("safety.max_elements_per_operation") == 500
-
-    def test_get_nonexistent_key_returns_default(self):
-        """Test that nonexistent keys return the default value"""
-        config = ConfigManager(self.config_file)
-        assert config.get("nonexistent_key", "default") == "default"
-        assert config.get("api_settings.nonexistent", 100) == 100
-
-    def test_get_without_default_returns_none(self):
-        """Test that get() without default returns None for missing keys"""
-        config = ConfigManager(self.config_file)
-        assert config.get("nonexistent_key") is None
-
-    def test_empty_config_file_raises_error(self):
-        """Test that empty configuration file raises ConfigurationError"""
-        # Create empty file
-        empty_file = os.path.join(self.temp_dir, "empty.yaml")
-        with open(empty_file, 'w') as f:
-            f.write("")
-
-        with pytest.raises(ConfigurationError, match="Configuration file is empty"):
-            ConfigManager(empty_file)
-
-        os.remove(empty_file)
-
-    def test_invalid_yaml_raises_error(self):
-        """Test that invalid YAML raises ConfigurationError"""
-        # Create invalid YAML
-        invalid_file = os.path.join(self.temp_dir, "invalid.yaml")
-        with open(invalid_file, 'w') as f:
-            f.write("invalid: yaml: content: [")
 
-        with pytest.raises(ConfigurationError, match="Invalid YAML"):
-            ConfigManager(invalid_file)
+        # The JSON sidecar was written for this exact file
+        st = os.stat(config_file)
+        with open(config.cache_path, encoding='utf-8') as f:
+            sidecar = json.load(f)
+        assert sidecar == {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "config": self.sample_config}
+
+        with patch.object(ConfigManager, '_parse_yaml') as parse:
+            # Same process: the parse cache answers without touching the sidecar
+            with patch.object(ConfigManager, '_load_json_cache') as load_sidecar:
+                assert ConfigManager(config_file).load_config() is config.load_config()
+            load_sidecar.assert_not_called()
+
+            # New session: the sidecar answers without parsing the YAML again
+            ConfigManager.clear_cache()
+            assert ConfigManager(config_file).get("language") == "en"
+        parse.assert_not_called()
+
+    @pytest.mark.parametrize("document, make_source, error", [
+        ("language: en\napi_settings:\n  model: claude-sonnet-4\n", str.encode, None),
+        ("language: en\napi_settings:\n  model: claude-sonnet-4\n", io.StringIO, None),
+        ("", str.encode, "Configuration file is empty"),
+        ("invalid: yaml: content: [", io.StringIO, "Invalid YAML"),
+    ], ids=["bytes", "stream", "empty", "invalid"])
+    def test_load_config_from_memory(self, document, make_source, error):
+        """Test parsing a YAML document passed as bytes or a file-like object"""
+        # Built per run: a stream is consumed by the first parse
+        config = ConfigManager(make_source(document))
+        assert config.config_path is None
+
+        if error:
+            with pytest.raises(ConfigurationError) as exc_info:
+                config.load_config()
+            assert error in str(exc_info.value)
+        else:
+            assert config.get("api_settings.model") == "claude-sonnet-4"
+
+    def test_empty_file_on_disk_raises_error(self):
+        """Test that an empty config file is rejected without parsing it"""
+        empty_file = os.path.join(self.temp_dir, "empty.yaml")
+        open(empty_file, 'w').close()
 
-        os.remove(invalid_file)
+        with patch.object(ConfigManager, '_parse_yaml') as parse:
+            with pytest.raises(ConfigurationError) as exc_info:
+                ConfigManager(empty_file).load_config()
+        assert "Configuration file is empty" in str(exc_info.value)
+        parse.assert_not_called()
 
     def test_nonexistent_file_creates_default_config(self):
         """Test that nonexistent file path is handled"""
@@ -121,6 +188,39 @@ class TestConfigManager:
             # Acceptable to raise ConfigurationError for missing file
             pass
 
+    def test_parsed_config_is_reused_until_file_changes(self):
+        """Test that unchanged files are parsed once per process"""
+        config_file = self._write_config("reused.yaml", self.sample_config)
+        first = ConfigManager(config_file)
+        first.load_config()
+
+        # Same file, unchanged: the parsed configuration is shared
+        second = ConfigManager(config_file)
+        assert second.load_config() is first.load_config()
+
+        # Changed file: parsed again
+        self._write_config("reused.yaml", dict(self.sample_config, language="he"))
+        os.utime(config_file, ns=(0, os.stat(config_file).st_mtime_ns + 1))
+
+        assert ConfigManager(config_file).get("language") == "he"
+
+    @pytest.mark.parametrize("sidecar", [
+        # Valid payload, but for another version of the file
+        lambda st: {"mtime_ns": st.st_mtime_ns - 1, "size": st.st_size, "config": {"language": "xx"}},
+        # Matching stamp, but not a configuration
+        lambda st: {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "config": ["language", "xx"]},
+        # Old format (bare configuration)
+        lambda st: {"language": "xx"},
+    ], ids=["stale_stamp", "not_a_mapping", "old_format"])
+    def test_unusable_json_sidecar_falls_back_to_yaml(self, sidecar):
+        """Test that the JSON sidecar is only used for the exact file it was written for"""
+        config_file = self._write_config("sidecar.yaml", self.sample_config)
+        manager = ConfigManager(config_file)
+        with open(manager.cache_path, 'w', encoding='utf-8') as f:
+            json.dump(sidecar(os.stat(config_file)), f)
+
+        assert manager.get("language") == "en"
+
     def test_singleton_pattern(self):
         """Test that get_config_manager returns singleton instance"""
         # This test may need to be adjusted based on actual singleton implementation
@@ -128,40 +228,140 @@ class TestConfigManager:
         config = get_config_manager()
         assert isinstance(config, ConfigManager)
 
+    def test_reset_config_manager_creates_new_instance(self):
+        """Test that reset_config_manager drops the global instance"""
+        first = get_config_manager()
+        assert get_config_manager() is first
+
+        reset_config_manager()
+        try:
+            assert get_config_manager() is not first
+        finally:
+            reset_config_manager()
+
+    def test_session_object_round_trips_through_pyrevit_envvars(self):
+        """Test that session objects are kept as pyRevit session variables"""
+        envvars = {}
+
+        with patch.dict(sys.modules, _fake_pyrevit(envvars)):
+            cache = {}
+            set_session_object("_revitai_test", cache)
+            assert get_session_object("_revitai_test") is cache
+        assert envvars == {"_revitai_test": cache}
+
+    def test_session_object_outside_pyrevit(self):
+        """Test that session storage is a no-op outside pyRevit"""
+        with patch.dict(sys.modules, {"pyrevit": None}):
+            set_session_object("_revitai_test", {})
+            assert get_session_object("_revitai_test") is None
+
+    @patch('config_manager.KEYRING_AVAILABLE', True)
+    @patch.dict(os.environ, {}, clear=True)
     def test_validate_api_key_with_valid_key(self):
         """Test API key validation with valid key"""
-        config = ConfigManager(self.config_file)
+        # In-memory keyring, so no OS keychain is queried
+        keyring = Mock()
+        keyring.get_password.return_value = "sk-ant-api03-" + "a" * 40
+
+        with patch.dict(sys.modules, {"keyring": keyring}):
+            config = ConfigManager(self.config_file)
+            result = config.validate_api_key()
 
-        # Note: This test may need mocking of keyring library
-        # For now, test the validation logic
-        result = config.validate_api_key()
         # Should return bool
         assert isinstance(result, bool)
+        assert result is True
+
+    @patch('config_manager.KEYRING_AVAILABLE', True)
+    @patch.dict(os.environ, {}, clear=True)
+    def test_get_api_key_ignores_malformed_stored_key(self):
+        """Test that a stored key not shaped like an Anthropic key is ignored"""
+        keyring = Mock()
+        keyring.get_password.return_value = "not-a-real-key"
+
+        with patch.dict(sys.modules, {"keyring": keyring}):
+            config = ConfigManager(self.config_file)
+            assert config.get_api_key() is None
+
+    @patch('config_manager.KEYRING_AVAILABLE', True)
+    @patch.dict(os.environ, {}, clear=True)
+    def test_get_api_key_returns_well_formed_stored_key(self):
+        """Test that a well-formed stored key is returned"""
+        api_key = "sk-ant-api03-" + "a" * 40
+        keyring = Mock()
+        keyring.get_password.return_value = api_key
+
+        with patch.dict(sys.modules, {"keyring": keyring}):
+            config = ConfigManager(self.config_file)
+            assert config.get_api_key() == api_key
+
+    @pytest.mark.parametrize("api_key, stored", [
+        ("sk-ant-api03-" + "a" * 40, True),
+        ("not-a-real-key", False),
+    ], ids=["well_formed", "malformed"])
+    @patch('config_manager.KEYRING_AVAILABLE', True)
+    @patch.dict(os.environ, {}, clear=True)
+    def test_set_api_key_agrees_with_get_api_key(self, api_key, stored):
+        """Test that set_api_key reports success only for keys get_api_key returns"""
+        passwords = {}
+        keyring = Mock()
+        keyring.set_password.side_effect = lambda service, name, value: passwords.__setitem__(name, value)
+        keyring.get_password.side_effect = lambda service, name: passwords.get(name)
+
+        with patch.dict(sys.modules, {"keyring": keyring}):
+            config = ConfigManager(self.config_file)
+            assert config.set_api_key(api_key) is stored
+            assert config.get_api_key() == (api_key if stored else None)
+
+    @patch('config_manager.KEYRING_AVAILABLE', True)
+    @patch.dict(os.environ, {}, clear=True)
+    def test_keyring_is_queried_once_per_session(self):
+        """Test that managers of later clicks reuse the session's keyring lookup"""
+        first_key = "sk-ant-api03-" + "a" * 40
+        second_key = "sk-ant-api03-" + "b" * 40
+        passwords = {ConfigManager.API_KEY_NAME: first_key}
+        keyring = Mock()
+        keyring.get_password.side_effect = lambda service, name: passwords.get(name)
+        keyring.set_password.side_effect = lambda service, name, value: passwords.__setitem__(name, value)
+
+        with patch.dict(sys.modules, dict(_fake_pyrevit({}), keyring=keyring)):
+            assert ConfigManager(self.config_file).get_api_key() == first_key
+            assert ConfigManager(self.config_file).get_api_key() == first_key
+            assert keyring.get_password.call_count == 1
+
+            # Setting the key drops the session's lookup
+            assert ConfigManager(self.config_file).set_api_key(second_key)
+            assert ConfigManager(self.config_file).get_api_key() == second_key
+            assert keyring.get_password.call_count == 2
+
+    def test_refresh_env_picks_up_new_api_key(self):
+        """Test that the env API key is snapshotted until refresh_env()"""
+        with patch.dict(os.environ, {"CLAUDE_API_KEY": "sk-ant-first"}):
+            config = ConfigManager(self.config_file)
+
+            os.environ["CLAUDE_API_KEY"] = "sk-ant-second"
+            assert config.get_api_key() == "sk-ant-first"
+
+            config.refresh_env()
+            assert config.get_api_key() == "sk-ant-second"
 
     def test_nested_dict_access_multiple_levels(self):
         """Test accessing deeply nested configuration values"""
-        config = ConfigManager(self.config_file)
-
-        # Add some deeply nested data
-        config._config["deep"] = {
-            "level1": {
-                "level2": {
-                    "level3": "value"
-                }
-            }
-        }
+        config_file = self._write_config(
+            "nested.yaml", {"deep": {"level1": {"level2": {"level3": "value"}}}}
+        )
+        config = ConfigManager(config_file)
 
         assert config.get("deep.level1.level2.level3") == "value"
+        assert config.get("deep.level1.level2") == {"level3": "value"}
+        assert config.get("deep.level1.missing", "default") == "default"
 
     def test_config_with_list_values(self):
         """Test configuration with list values"""
-        # Add list to config
-        with open(self.config_file, 'w') as f:
-            test_config = self.sample_config.copy()
-            test_config["allowed_operations"] = ["create_dimensions", "create_tags"]
-            yaml.dump(test_config, f)
+        config_file = os.path.join(self.temp_dir, "with_lists.yaml")
+        with open(config_file, 'wb') as f:
+            f.write(_SAMPLE_CONFIG_WITH_LIST_YAML_BYTES)
 
-        config = ConfigManager(self.config_file)
+        config = ConfigManager(config_file)
         operations = config.get("allowed_operations")
         assert isinstance(operations, list)
         assert "create_dimensions" in operations
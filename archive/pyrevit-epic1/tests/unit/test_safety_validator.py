@@ -5,25 +5,19 @@ Tests the operation allowlist, blocklist, and scope validation logic.
 """
 
 import pytest
-import sys
-import os
 
-# Add lib to path
-lib_path = os.path.join(os.path.dirname(__file__), '..', '..', '.extensions', 'RevitAI.extension', 'lib')
-sys.path.insert(0, lib_path)
-
-from safety_validator import SafetyValidator
+from safety_validator import ALLOWED_OPERATIONS, BLOCKED_OPERATIONS
 from exceptions import ValidationError
 
+# Sorted so every pytest-xdist worker collects the cases in the same order
+ALLOWED_OPS = sorted(ALLOWED_OPERATIONS)
+BLOCKED_OPS = sorted(BLOCKED_OPERATIONS)
+
 
 class TestSafetyValidator:
     """Test suite for SafetyValidator"""
 
-    def setup_method(self):
-        """Set up test fixtures before each test"""
-        self.validator = SafetyValidator()
-
-    def test_allowed_operation_passes(self):
+    def test_allowed_operation_passes(self, validator):
         """Test that allowed operations pass validation"""
         action = {
             "operation": "create_dimensions",
@@ -35,9 +29,9 @@ class TestSafetyValidator:
         }
 
         # Should not raise exception
-        self.validator.validate_action(action)
+        validator.validate_action(action)
 
-    def test_blocked_operation_raises_error(self):
+    def test_blocked_operation_raises_error(self, validator):
         """Test that blocked operations raise ValidationError"""
         action = {
             "operation": "delete_elements",
@@ -48,20 +42,23 @@ class TestSafetyValidator:
             "params": {}
         }
 
-        with pytest.raises(ValidationError, match="Operation 'delete_elements' is not allowed"):
-            self.validator.validate_action(action)
+        with pytest.raises(ValidationError) as exc_info:
+            validator.validate_action(action)
+        assert "Operation 'delete_elements' is explicitly forbidden" in str(exc_info.value)
 
-    def test_invalid_action_format_raises_error(self):
+    def test_invalid_action_format_raises_error(self, validator):
         """Test that invalid action format raises ValidationError"""
         # Not a dictionary
-        with pytest.raises(ValidationError, match="Action must be a dictionary"):
-            self.validator.validate_action("invalid")
+        with pytest.raises(ValidationError) as exc_info:
+            validator.validate_action("invalid")
+        assert "Action must be a dictionary" in str(exc_info.value)
 
         # Missing operation field
-        with pytest.raises(ValidationError, match="Action missing 'operation' field"):
-            self.validator.validate_action({"target": {}})
+        with pytest.raises(ValidationError) as exc_info:
+            validator.validate_action({"target": {}})
+        assert "Action missing 'operation' field" in str(exc_info.value)
 
-    def test_scope_too_large_raises_error(self):
+    def test_scope_too_large_raises_error(self, validator):
         """Test that scope validation rejects too many elements"""
         action = {
             "operation": "create_dimensions",
@@ -73,12 +70,13 @@ class TestSafetyValidator:
         }
 
         # Mock element count > max allowed
-        large_count = self.validator.max_elements + 100
+        large_count = validator.max_elements + 100
 
-        with pytest.raises(ValidationError, match="Operation scope too large"):
-            self.validator._validate_scope(action, large_count)
+        with pytest.raises(ValidationError) as exc_info:
+            validator._validate_scope(action, large_count)
+        assert "Operation scope too large" in str(exc_info.value)
 
-    def test_create_dimensions_validation(self):
+    def test_create_dimensions_validation(self, validator):
         """Test dimension-specific validation"""
         action = {
             "operation": "create_dimensions",
@@ -92,14 +90,15 @@ class TestSafetyValidator:
         }
 
         # Valid action should pass
-        self.validator._validate_create_dimensions(action, 10)
+        validator._validate_create_dimensions(action, 10)
 
         # Too many dimensions should fail
-        large_count = self.validator.max_dimensions + 1
-        with pytest.raises(ValidationError, match="Too many dimensions"):
-            self.validator._validate_create_dimensions(action, large_count)
+        large_count = validator.max_dimensions + 1
+        with pytest.raises(ValidationError) as exc_info:
+            validator._validate_create_dimensions(action, large_count)
+        assert "Too many dimensions" in str(exc_info.value)
 
-    def test_create_tags_validation(self):
+    def test_create_tags_validation(self, validator):
         """Test tag-specific validation"""
         action = {
             "operation": "create_tags",
@@ -111,14 +110,15 @@ class TestSafetyValidator:
         }
 
         # Valid action should pass
-        self.validator._validate_create_tags(action, 10)
+        validator._validate_create_tags(action, 10)
 
         # Too many tags should fail
-        large_count = self.validator.max_tags + 1
-        with pytest.raises(ValidationError, match="Too many tags"):
-            self.validator._validate_create_tags(action, large_count)
+        large_count = validator.max_tags + 1
+        with pytest.raises(ValidationError) as exc_info:
+            validator._validate_create_tags(action, large_count)
+        assert "Too many tags" in str(exc_info.value)
 
-    def test_read_elements_validation(self):
+    def test_read_elements_validation(self, validator):
         """Test read_elements validation"""
         action = {
             "operation": "read_elements",
@@ -132,49 +132,51 @@ class TestSafetyValidator:
         }
 
         # Valid action should pass
-        self.validator._validate_read_elements(action, 10)
+        validator._validate_read_elements(action, 10)
 
         # Too many elements should fail
-        large_count = self.validator.max_elements + 1
-        with pytest.raises(ValidationError, match="Too many elements to read"):
-            self.validator._validate_read_elements(action, large_count)
+        large_count = validator.max_elements + 1
+        with pytest.raises(ValidationError) as exc_info:
+            validator._validate_read_elements(action, large_count)
+        assert "Too many elements to read" in str(exc_info.value)
 
-    def test_all_allowed_operations_are_valid(self):
+    @pytest.mark.parametrize("operation", ALLOWED_OPS)
+    def test_all_allowed_operations_are_valid(self, validator, operation):
         """Test that all allowed operations have validators"""
-        for operation in self.validator.allowed_operations:
-            action = {
-                "operation": operation,
-                "target": {
-                    "element_type": "test",
-                    "filters": {}
-                },
-                "params": {}
-            }
+        action = {
+            "operation": operation,
+            "target": {
+                "element_type": "test",
+                "filters": {}
+            },
+            "params": {}
+        }
 
-            # Should not raise exception for allowed operations
-            # (may fail on specific validation but not on allowlist check)
-            try:
-                self.validator.validate_action(action)
-            except ValidationError as e:
-                # Acceptable if it's a specific validation error, not allowlist
-                assert "not allowed" not in str(e).lower()
+        # Should not raise exception for allowed operations
+        # (may fail on specific validation but not on allowlist check)
+        try:
+            validator.validate_action(action)
+        except ValidationError as e:
+            # Acceptable if it's a specific validation error, not allowlist
+            assert "not allowed" not in str(e).lower()
 
-    def test_all_blocked_operations_are_rejected(self):
+    @pytest.mark.parametrize("operation", BLOCKED_OPS)
+    def test_all_blocked_operations_are_rejected(self, validator, operation):
         """Test that all blocked operations are properly rejected"""
-        for operation in self.validator.blocked_operations:
-            action = {
-                "operation": operation,
-                "target": {
-                    "element_type": "test",
-                    "filters": {}
-                },
-                "params": {}
-            }
+        action = {
+            "operation": operation,
+            "target": {
+                "element_type": "test",
+                "filters": {}
+            },
+            "params": {}
+        }
 
-            with pytest.raises(ValidationError, match=f"Operation '{operation}' is not allowed"):
-                self.validator.validate_action(action)
+        with pytest.raises(ValidationError) as exc_info:
+            validator.validate_action(action)
+        assert f"Operation '{operation}' is explicitly forbidden" in str(exc_info.value)
 
-    def test_unknown_operation_is_rejected(self):
+    def test_unknown_operation_is_rejected(self, validator):
         """Test that unknown operations are rejected"""
         action = {
             "operation": "unknown_operation_xyz",
@@ -182,10 +184,11 @@ class TestSafetyValidator:
             "params": {}
         }
 
-        with pytest.raises(ValidationError, match="Operation 'unknown_operation_xyz' is not allowed"):
-            self.validator.validate_action(action)
+        with pytest.raises(ValidationError) as exc_info:
+            validator.validate_action(action)
+        assert "Operation 'unknown_operation_xyz' is not allowed" in str(exc_info.value)
 
-    def test_validate_scope_with_zero_elements(self):
+    def test_validate_scope_with_zero_elements(self, validator):
         """Test scope validation with zero elements"""
         action = {
             "operation": "create_dimensions",
@@ -194,9 +197,9 @@ class TestSafetyValidator:
         }
 
         # Zero elements should be valid (edge case)
-        self.validator._validate_scope(action, 0)
+        validator._validate_scope(action, 0)
 
-    def test_validate_scope_at_boundary(self):
+    def test_validate_scope_at_boundary(self, validator):
         """Test scope validation at exactly max_elements"""
         action = {
             "operation": "create_dimensions",
@@ -205,11 +208,31 @@ class TestSafetyValidator:
         }
 
         # Exactly max_elements should pass
-        self.validator._validate_scope(action, self.validator.max_elements)
+        validator._validate_scope(action, validator.max_elements)
 
         # One more should fail
         with pytest.raises(ValidationError):
-            self.validator._validate_scope(action, self.validator.max_elements + 1)
+            validator._validate_scope(action, validator.max_elements + 1)
+
+    def test_validate_actions_reports_index_of_first_invalid_action(self, validator):
+        """Test that batch validation stops at the first invalid action"""
+        actions = [
+            {"operation": "create_dimensions", "targets": {}},
+            {"operation": "read_elements", "targets": {}},
+            {"operation": "delete_elements", "targets": {}},
+            "invalid",
+        ]
+
+        # Valid prefix passes
+        validator.validate_actions(actions[:2])
+
+        with pytest.raises(ValidationError) as exc_info:
+            validator.validate_actions(actions)
+        assert str(exc_info.value).startswith("Action [2]: Operation 'delete_elements'")
+
+        with pytest.raises(ValidationError) as exc_info:
+            validator.validate_actions(actions[3:])
+        assert str(exc_info.value).startswith("Action [0]: Action must be a dictionary")
 
 
 if __name__ == "__main__":
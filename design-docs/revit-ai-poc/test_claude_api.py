@@ -17,6 +17,14 @@ CLAUDE_MODEL = "claude-sonnet-4-20250514"
 API_URL = "https://api.anthropic.com/v1/messages"
 # =========================================
 
+# Shared HTTP session: keeps the connection (and TLS handshake) alive
+# across requests when the test is run repeatedly
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    "anthropic-version": "2023-06-01",
+    "content-type": "application/json"
+})
+
 # Sample schedule data (simulates what Revit would send)
 SAMPLE_SCHEDULE = {
     "Name": "Wall Schedule",
@@ -88,11 +96,9 @@ def test_claude_api():
     print("Sending sample wall schedule to Claude...")
     print()
     
-    # Prepare request
+    # Prepare request (version and content-type headers come from _SESSION)
     headers = {
-        "x-api-key": ANTHROPIC_API_KEY,
-        "anthropic-version": "2023-06-01",
-        "content-type": "application/json"
+        "x-api-key": ANTHROPIC_API_KEY
     }
     
     payload = {
@@ -108,7 +114,7 @@ def test_claude_api():
     
     # Send request
     try:
-        response = requests.post(API_URL, headers=headers, json=payload, timeout=30)
+        response = _SESSION.post(API_URL, headers=headers, json=payload, timeout=30)
         
         if response.status_code != 200:
             print(f"❌ ERROR: API returned status {response.status_code}")